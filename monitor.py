@@ -1,10 +1,20 @@
 import os
 import json
+import mmap
 import requests
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
+from glob import glob
 from typing import Dict, List, Set
 import hashlib
 
+from services.prefixes import extract_prefixes, diff_prefixes, write_prefix_sidecar
+
+try:
+    import orjson  # optional: much faster JSON parse/serialize
+except ImportError:
+    orjson = None
+
 class GoogleIPMonitor:
     def __init__(self):
         self.urls = {
@@ -12,30 +22,134 @@ class GoogleIPMonitor:
             'goog': 'https://www.gstatic.com/ipranges/goog.json'
         }
         self.data_dir = 'data'
+        # One session for all requests: keep-alive amortizes the TCP/TLS
+        # handshake across the two gstatic endpoints
+        self.session = requests.Session()
         self.telegram_token = os.getenv('TELEGRAM_BOT_TOKEN')
         self.telegram_chat_id = os.getenv('TELEGRAM_CHAT_ID')
-        
+
         # Create data directory if it doesn't exist
         os.makedirs(self.data_dir, exist_ok=True)
+
+        # Cached ETag/Last-Modified validators for conditional GETs
+        self.http_meta_file = os.path.join(self.data_dir, '.http_meta.json')
+        self._http_meta = self._load_http_meta()
+
+    def _load_http_meta(self) -> Dict:
+        """Load the ETag/Last-Modified validators from the last fetch"""
+        if not os.path.exists(self.http_meta_file):
+            return {}
+        try:
+            with open(self.http_meta_file, 'r') as f:
+                return json.load(f)
+        except Exception as e:
+            print(f"Error loading HTTP metadata: {e}")
+            return {}
+
+    def _save_http_meta(self):
+        """Persist validators so the next run can send conditional GETs"""
+        with open(self.http_meta_file, 'w') as f:
+            json.dump(self._http_meta, f, indent=2)
+
+    def _parse_json_file(self, filename: str) -> Dict:
+        """Parse a snapshot file from disk.
+
+        With orjson installed the file is memory-mapped and parsed in
+        place, avoiding the userspace read buffer; otherwise it is read
+        whole and handed to stdlib json.
+        """
+        with open(filename, 'rb') as f:
+            if orjson is not None:
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                    view = memoryview(mm)
+                    try:
+                        return orjson.loads(view)
+                    finally:
+                        view.release()
+            return json.loads(f.read())
+
+    def _load_latest_snapshot(self) -> Dict:
+        """Load the most recent saved snapshot (for 304 responses)"""
+        data_files = sorted(glob(os.path.join(self.data_dir, '*.json')))
+        if not data_files:
+            return {}
+        return self._parse_json_file(data_files[-1])
     
+    # Sentinel for a 304 Not Modified response
+    _UNCHANGED = object()
+
     def fetch_ip_data(self) -> Dict:
         """Fetch current IP data from Google"""
+        def fetch_one(name, url):
+            headers = {}
+            meta = self._http_meta.get(name, {})
+            if meta.get('etag'):
+                headers['If-None-Match'] = meta['etag']
+            if meta.get('last_modified'):
+                headers['If-Modified-Since'] = meta['last_modified']
+
+            response = self.session.get(url, timeout=10, headers=headers)
+            if response.status_code == 304:
+                return self._UNCHANGED
+            response.raise_for_status()
+            self._http_meta[name] = {
+                'etag': response.headers.get('ETag', ''),
+                'last_modified': response.headers.get('Last-Modified', '')
+            }
+            return response.json()
+
+        # The two endpoints are independent, so fetch them concurrently
+        # and overlap the network round trips
         data = {}
-        for name, url in self.urls.items():
-            try:
-                response = requests.get(url, timeout=10)
-                response.raise_for_status()
-                data[name] = response.json()
-            except Exception as e:
-                print(f"Error fetching {name}: {e}")
-                data[name] = None
+        with ThreadPoolExecutor(max_workers=len(self.urls)) as executor:
+            futures = {name: executor.submit(fetch_one, name, url)
+                       for name, url in self.urls.items()}
+            for name, future in futures.items():
+                try:
+                    data[name] = future.result()
+                except Exception as e:
+                    print(f"Error fetching {name}: {e}")
+                    data[name] = None
+                    # Drop the validator: keeping it would make the next
+                    # run get a 304 and "reuse" the bad snapshot this run
+                    # is about to save
+                    self._http_meta.pop(name, None)
+
+        # 304s mean upstream hasn't changed: reuse the latest snapshot
+        # instead of downloading and parsing the body again
+        if any(value is self._UNCHANGED for value in data.values()):
+            latest = self._load_latest_snapshot()
+            for name, value in data.items():
+                if value is not self._UNCHANGED:
+                    continue
+                snapshot = latest.get(name)
+                if snapshot:
+                    print(f"{name} not modified; reusing local snapshot")
+                    data[name] = snapshot
+                    continue
+                # No usable local copy (e.g. an earlier run saved a null
+                # after a failed fetch) — forget the validator and fetch
+                # the body unconditionally
+                print(f"{name} not modified but no usable snapshot; refetching")
+                self._http_meta.pop(name, None)
+                try:
+                    data[name] = fetch_one(name, self.urls[name])
+                except Exception as e:
+                    print(f"Error fetching {name}: {e}")
+                    data[name] = None
+
+        self._save_http_meta()
         return data
     
     def save_data(self, data: Dict, date: str):
         """Save IP data to file"""
         filename = os.path.join(self.data_dir, f'{date}.json')
-        with open(filename, 'w') as f:
-            json.dump(data, f, indent=2)
+        if orjson is not None:
+            with open(filename, 'wb') as f:
+                f.write(orjson.dumps(data, option=orjson.OPT_INDENT_2))
+        else:
+            with open(filename, 'w') as f:
+                json.dump(data, f, indent=2)
         print(f"Saved data to {filename}")
     
     def load_data(self, date: str) -> Dict:
@@ -43,28 +157,23 @@ class GoogleIPMonitor:
         filename = os.path.join(self.data_dir, f'{date}.json')
         if not os.path.exists(filename):
             return None
-        with open(filename, 'r') as f:
-            return json.load(f)
+        return self._parse_json_file(filename)
     
+    def save_prefixes(self, prefixes: Set[str], date: str):
+        """Persist the extracted prefix set as a sidecar file.
+
+        generate_report reads <date>.prefixes.txt back with a plain
+        split, skipping the JSON parse for files written by the monitor.
+        The write goes through the shared atomic helper so a crash
+        mid-write can never leave a torn sidecar with a fresh mtime.
+        """
+        filename = os.path.join(self.data_dir, f'{date}.prefixes.txt')
+        write_prefix_sidecar(filename, sorted(prefixes))
+
     def extract_prefixes(self, data: Dict) -> Set[str]:
         """Extract all IP prefixes from data"""
-        prefixes = set()
-        
-        if data.get('cloud'):
-            for prefix_entry in data['cloud'].get('prefixes', []):
-                if 'ipv4Prefix' in prefix_entry:
-                    prefixes.add(prefix_entry['ipv4Prefix'])
-                if 'ipv6Prefix' in prefix_entry:
-                    prefixes.add(prefix_entry['ipv6Prefix'])
-        
-        if data.get('goog'):
-            for prefix_entry in data['goog'].get('prefixes', []):
-                if 'ipv4Prefix' in prefix_entry:
-                    prefixes.add(prefix_entry['ipv4Prefix'])
-                if 'ipv6Prefix' in prefix_entry:
-                    prefixes.add(prefix_entry['ipv6Prefix'])
-        
-        return prefixes
+        ipv4, ipv6 = extract_prefixes(data)
+        return ipv4 | ipv6
     
     def compare_data(self, old_data: Dict, new_data: Dict) -> Dict:
         """Compare two datasets and find differences"""
@@ -78,9 +187,8 @@ class GoogleIPMonitor:
         
         old_prefixes = self.extract_prefixes(old_data)
         new_prefixes = self.extract_prefixes(new_data)
-        
-        added = new_prefixes - old_prefixes
-        removed = old_prefixes - new_prefixes
+
+        added, removed = diff_prefixes(old_prefixes, new_prefixes)
         
         return {
             'added': sorted(list(added)),
@@ -159,8 +267,9 @@ class GoogleIPMonitor:
             print("Failed to fetch data")
             return
         
-        # Save today's data
+        # Save today's data and pre-warm the prefix sidecar for the report
         self.save_data(current_data, today)
+        self.save_prefixes(self.extract_prefixes(current_data), today)
         
         # Load yesterday's data
         previous_data = self.load_data(yesterday)
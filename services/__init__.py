@@ -7,6 +7,8 @@ and data analysis following microservices architecture principles.
 
 __version__ = "1.1.0"
 __all__ = [
+    "prefixes",
+    "metrics_loader",
     "aggregator_service",
     "chart_config_service",
     "chart_renderer_service",
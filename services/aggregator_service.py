@@ -12,9 +12,24 @@ This service is independent and reusable by other components.
 
 import os
 import json
+import mmap
+import heapq
+from bisect import bisect_left
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
-from typing import Dict, List, Set
-from glob import glob
+from typing import Dict, List, Optional, Set, Tuple
+
+try:
+    import orjson  # optional: much faster JSON parse/serialize
+except ImportError:
+    orjson = None
+
+try:
+    from services.prefixes import (extract_prefixes, load_day_prefixes,
+                                   sorted_diff_counts)
+except ImportError:  # standalone run: python services/aggregator_service.py
+    from prefixes import (extract_prefixes, load_day_prefixes,
+                          sorted_diff_counts)
 
 
 class DataAggregatorService:
@@ -23,6 +38,14 @@ class DataAggregatorService:
     Single Responsibility: Data parsing and metric computation.
     """
 
+    # Bumped whenever the cached metrics layout changes; caches written
+    # by other versions trigger a full rebuild instead of a resume
+    CACHE_VERSION = '1.3.0'
+
+    # The six parallel per-day series kept in metrics.json
+    _SERIES_KEYS = ('timestamps', 'total_ranges', 'ipv4_counts',
+                    'ipv6_counts', 'daily_added', 'daily_removed')
+
     def __init__(self, data_dir: str = 'data', cache_dir: str = 'cache'):
         self.data_dir = data_dir
         self.cache_dir = cache_dir
@@ -31,117 +54,258 @@ class DataAggregatorService:
         # Ensure cache directory exists
         os.makedirs(cache_dir, exist_ok=True)
 
-    def extract_prefixes(self, data: Dict) -> Set[str]:
-        """Extract all IP prefixes from a data snapshot"""
-        prefixes = set()
-
-        if data.get('cloud'):
-            for prefix_entry in data['cloud'].get('prefixes', []):
-                if 'ipv4Prefix' in prefix_entry:
-                    prefixes.add(prefix_entry['ipv4Prefix'])
-                if 'ipv6Prefix' in prefix_entry:
-                    prefixes.add(prefix_entry['ipv6Prefix'])
-
-        if data.get('goog'):
-            for prefix_entry in data['goog'].get('prefixes', []):
-                if 'ipv4Prefix' in prefix_entry:
-                    prefixes.add(prefix_entry['ipv4Prefix'])
-                if 'ipv6Prefix' in prefix_entry:
-                    prefixes.add(prefix_entry['ipv6Prefix'])
-
-        return prefixes
-
-    def separate_ipv4_ipv6(self, prefixes: Set[str]) -> Dict[str, List[str]]:
-        """Separate IPv4 and IPv6 prefixes"""
-        ipv4 = [ip for ip in prefixes if ':' not in ip]
-        ipv6 = [ip for ip in prefixes if ':' in ip]
+    def extract_prefixes(self, data: Dict) -> Tuple[Set[str], Set[str]]:
+        """Extract (ipv4, ipv6) prefix sets from a data snapshot"""
+        return extract_prefixes(data)
+
+    def separate_ipv4_ipv6(self, prefixes: Set[str], sort: bool = False) -> Dict[str, List[str]]:
+        """Separate IPv4 and IPv6 prefixes in a single pass.
+
+        Sorting is opt-in: most callers only need the counts, so the
+        two O(n log n) sorts are skipped unless asked for.
+        """
+        ipv4: List[str] = []
+        ipv6: List[str] = []
+        for ip in prefixes:
+            (ipv6 if ':' in ip else ipv4).append(ip)
+        if sort:
+            ipv4.sort()
+            ipv6.sort()
         return {
-            'ipv4': sorted(ipv4),
-            'ipv6': sorted(ipv6)
+            'ipv4': ipv4,
+            'ipv6': ipv6
         }
 
+    def _list_data_files(self, days: int = 90) -> List[Tuple[str, str]]:
+        """List the last N daily data files as (date, path) pairs.
+
+        One scandir pass plus a bounded heap: the YYYY-MM-DD.json names
+        sort chronologically, so nlargest picks the window in
+        O(N log days) without sorting the whole directory. Dotfiles
+        (.http_meta.json) and sidecars are skipped.
+        """
+        with os.scandir(self.data_dir) as it:
+            names = [e.name for e in it
+                     if e.name.endswith('.json')
+                     and not e.name.startswith('.')
+                     and e.is_file()]
+
+        if not names:
+            print("Warning: No historical data files found")
+            return []
+
+        latest = heapq.nlargest(days, names)
+        latest.sort()
+
+        return [(name.replace('.json', ''), os.path.join(self.data_dir, name))
+                for name in latest]
+
+    def _parse_data_file(self, file_path: str) -> Optional[Dict]:
+        """Parse one daily data file, returning None on error.
+
+        With orjson installed the file is memory-mapped and parsed in
+        place — no userspace read buffer, and safe to use from the
+        parse thread pool since the mapping is read-only. The stdlib
+        fallback reads the file whole as before.
+        """
+        try:
+            with open(file_path, 'rb') as f:
+                if orjson is not None:
+                    with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                        view = memoryview(mm)
+                        try:
+                            return orjson.loads(view)
+                        finally:
+                            view.release()
+                return json.loads(f.read())
+        except Exception as e:
+            print(f"Error loading {file_path}: {e}")
+            return None
+
+    def _parse_data_files(self, file_paths: List[str]) -> List[Optional[Dict]]:
+        """Parse several daily files, preserving input order.
+
+        The per-file read+parse is dispatched across a thread pool so
+        the read() syscalls overlap; this is the dominant cost of a
+        cold aggregation run. Failed files come back as None, matching
+        _parse_data_file.
+        """
+        if len(file_paths) <= 1:
+            return [self._parse_data_file(p) for p in file_paths]
+        with ThreadPoolExecutor(max_workers=min(16, len(file_paths))) as executor:
+            return list(executor.map(self._parse_data_file, file_paths))
+
+    def _load_day_prefixes(self, file_path: str) -> Optional[Tuple[List[str], List[str]]]:
+        """Load one day's sorted (ipv4, ipv6) lists via the shared
+        sidecar loader in services.prefixes"""
+        return load_day_prefixes(file_path)
+
+    def _load_many_prefixes(self, file_paths: List[str]) -> List[Optional[Tuple[List[str], List[str]]]]:
+        """Load several days' prefix sets, preserving input order"""
+        if len(file_paths) <= 1:
+            return [self._load_day_prefixes(p) for p in file_paths]
+        with ThreadPoolExecutor(max_workers=min(16, len(file_paths))) as executor:
+            return list(executor.map(self._load_day_prefixes, file_paths))
+
     def load_historical_data(self, days: int = 90) -> List[Dict]:
         """
         Load historical data files from the last N days.
         Returns list of (date, data) tuples.
         """
-        data_files = sorted(glob(os.path.join(self.data_dir, '*.json')))
+        files = self._list_data_files(days)
+        parsed = self._parse_data_files([path for _, path in files])
+        return [{'date': date_str, 'data': data}
+                for (date_str, _), data in zip(files, parsed)
+                if data is not None]
 
-        if not data_files:
-            print("Warning: No historical data files found")
-            return []
+    def _resume_from_cache(self, dates: List[str]):
+        """
+        Seed the per-day series from the cached metrics when possible.
+
+        Past daily files are immutable, so a cached window that lines up
+        with the current date list can be reused — except for its newest
+        day: the monitor rewrites data/<today>.json on every run, so a
+        cached entry for the window's last date may be stale and is
+        always handed back for reprocessing (previous_prefixes comes
+        back None in that case; the caller reloads the preceding day as
+        the diff baseline).
+        Returns (series, previous_prefixes, resume_index); an unusable
+        cache (missing, older schema, misaligned window) yields a fresh
+        series and resume_index 0, i.e. a full rebuild.
+        """
+        fresh = ({key: [] for key in self._SERIES_KEYS}, None, 0)
 
-        # Limit to last N days
-        data_files = data_files[-days:] if len(data_files) > days else data_files
-
-        historical_data = []
-
-        for file_path in data_files:
-            try:
-                date_str = os.path.basename(file_path).replace('.json', '')
-                with open(file_path, 'r') as f:
-                    data = json.load(f)
-                    historical_data.append({
-                        'date': date_str,
-                        'data': data
-                    })
-            except Exception as e:
-                print(f"Error loading {file_path}: {e}")
-                continue
+        if not os.path.exists(self.metrics_cache_file):
+            return fresh
 
-        return historical_data
+        try:
+            with open(self.metrics_cache_file, 'rb') as f:
+                raw = f.read()
+            cached = orjson.loads(raw) if orjson is not None else json.loads(raw)
+        except Exception:
+            return fresh
+
+        if (cached.get('metadata', {}).get('version') != self.CACHE_VERSION
+                or '_last_ipv4' not in cached or '_last_ipv6' not in cached):
+            return fresh
+
+        timestamps = cached.get('timestamps') or []
+        # Drop cached days that expired out of the requested window;
+        # ISO dates sort lexicographically, so bisect finds the cut
+        drop = bisect_left(timestamps, dates[0])
+        kept = timestamps[drop:]
+
+        # The surviving cached dates must be exactly the head of the
+        # current window, and all six series must line up with them
+        if not kept or kept != dates[:len(kept)]:
+            return fresh
+        try:
+            series = {key: cached[key][drop:] for key in self._SERIES_KEYS}
+        except (KeyError, TypeError):
+            return fresh
+        if any(len(values) != len(kept) for values in series.values()):
+            return fresh
+
+        # A cold rebuild has no baseline for the window's first day and
+        # zeroes its change counts; when the cached head expired out of
+        # the window, the new first day still carries its diff against
+        # the dropped predecessor. Zero it so the series never depends
+        # on whether the cache survived.
+        if drop:
+            series['daily_added'][0] = 0
+            series['daily_removed'][0] = 0
+
+        # The cached lists are stored sorted, ready for the merge kernel
+        previous = (cached['_last_ipv4'], cached['_last_ipv6'])
+        resume = len(kept)
+
+        # The cache covers the whole window, so its last entry is the
+        # mutable newest snapshot — drop it and re-aggregate that day
+        if resume == len(dates):
+            resume -= 1
+            if resume == 0:
+                return fresh
+            for values in series.values():
+                values.pop()
+            # _last_ipv4/_last_ipv6 describe the day just dropped, not
+            # its baseline — signal the caller to reload the prior day
+            previous = None
+
+        return series, previous, resume
 
     def aggregate_all_data(self, days: int = 90) -> Dict:
         """
         Main aggregation method.
         Computes all metrics and returns structured data.
+
+        Runs incrementally: days already present in the cached metrics
+        are reused and only new data files are parsed, turning the
+        usual run into O(new days) instead of an O(window) rescan.
         """
-        historical_data = self.load_historical_data(days)
+        files = self._list_data_files(days)
 
-        if not historical_data:
+        if not files:
             return self._get_empty_metrics()
 
-        timestamps = []
-        total_ranges = []
-        ipv4_counts = []
-        ipv6_counts = []
-        daily_added = []
-        daily_removed = []
+        dates = [date for date, _ in files]
+        series, previous_prefixes, resume = self._resume_from_cache(dates)
+
+        if resume and previous_prefixes is None:
+            # The window's newest cached day is being reprocessed; its
+            # diff baseline is the (immutable) day before it, which the
+            # sidecar makes cheap to reload
+            previous_prefixes = self._load_day_prefixes(files[resume - 1][1])
+            if previous_prefixes is None:
+                series = {key: [] for key in self._SERIES_KEYS}
+                resume = 0
+
+        if resume:
+            print(f"♻️  Reusing {resume} cached day(s); "
+                  f"parsing {len(files) - resume} new file(s)")
+
+        new_files = files[resume:]
+        loaded = self._load_many_prefixes([path for _, path in new_files])
 
-        previous_prefixes = None
+        # Running summary accumulator; the cached head is summed once at
+        # resume instead of re-traversing the finished list at the end
+        total_added = sum(series['daily_added'])
 
-        for entry in historical_data:
-            date = entry['date']
-            data = entry['data']
+        for (date, _), prefixes in zip(new_files, loaded):
+            if prefixes is None:
+                continue
 
-            current_prefixes = self.extract_prefixes(data)
-            split = self.separate_ipv4_ipv6(current_prefixes)
+            ipv4, ipv6 = prefixes
 
-            timestamps.append(date)
-            total_ranges.append(len(current_prefixes))
-            ipv4_counts.append(len(split['ipv4']))
-            ipv6_counts.append(len(split['ipv6']))
+            series['timestamps'].append(date)
+            series['total_ranges'].append(len(ipv4) + len(ipv6))
+            series['ipv4_counts'].append(len(ipv4))
+            series['ipv6_counts'].append(len(ipv6))
 
-            # Calculate daily changes
+            # Consecutive days are sorted lists, so one sequential
+            # two-pointer merge per family counts both change
+            # directions — no hash tables, no result sets
             if previous_prefixes is not None:
-                added = current_prefixes - previous_prefixes
-                removed = previous_prefixes - current_prefixes
-                daily_added.append(len(added))
-                daily_removed.append(len(removed))
+                added_v4, removed_v4 = sorted_diff_counts(ipv4, previous_prefixes[0])
+                added_v6, removed_v6 = sorted_diff_counts(ipv6, previous_prefixes[1])
+                added_n = added_v4 + added_v6
+                series['daily_added'].append(added_n)
+                series['daily_removed'].append(removed_v4 + removed_v6)
+                total_added += added_n
             else:
-                daily_added.append(0)
-                daily_removed.append(0)
+                series['daily_added'].append(0)
+                series['daily_removed'].append(0)
+
+            previous_prefixes = (ipv4, ipv6)
 
-            previous_prefixes = current_prefixes
+        timestamps = series['timestamps']
+        total_ranges = series['total_ranges']
+        ipv4_counts = series['ipv4_counts']
+        ipv6_counts = series['ipv6_counts']
+        daily_added = series['daily_added']
 
         # Calculate trends
         metrics = {
-            'timestamps': timestamps,
-            'total_ranges': total_ranges,
-            'ipv4_counts': ipv4_counts,
-            'ipv6_counts': ipv6_counts,
-            'daily_added': daily_added,
-            'daily_removed': daily_removed,
+            **series,
             'summary': {
                 'total_data_points': len(timestamps),
                 'date_range': {
@@ -152,12 +316,16 @@ class DataAggregatorService:
                 'current_ipv4': ipv4_counts[-1] if ipv4_counts else 0,
                 'current_ipv6': ipv6_counts[-1] if ipv6_counts else 0,
                 'total_growth': total_ranges[-1] - total_ranges[0] if len(total_ranges) > 1 else 0,
-                'avg_daily_change': sum(daily_added) / len(daily_added) if daily_added else 0
+                'avg_daily_change': total_added / len(daily_added) if daily_added else 0
             },
+            # Last day's full sorted prefix lists, so the next run can
+            # diff its first new day without re-parsing this one
+            '_last_ipv4': previous_prefixes[0] if previous_prefixes else [],
+            '_last_ipv6': previous_prefixes[1] if previous_prefixes else [],
             'metadata': {
                 'generated_at': datetime.now().isoformat(),
                 'service': 'DataAggregatorService',
-                'version': '1.1.0'
+                'version': self.CACHE_VERSION
             }
         }
 
@@ -184,15 +352,27 @@ class DataAggregatorService:
             'metadata': {
                 'generated_at': datetime.now().isoformat(),
                 'service': 'DataAggregatorService',
-                'version': '1.1.0'
+                'version': self.CACHE_VERSION
             }
         }
 
     def save_to_cache(self, metrics: Dict) -> bool:
-        """Save aggregated metrics to cache file"""
+        """Save aggregated metrics to cache file.
+
+        Serialized with orjson when available and renamed into place so
+        a crash mid-write never leaves a torn metrics.json behind. The
+        file is machine-consumed only, so it is written compact — no
+        indentation bytes to serialize, store or parse back.
+        """
         try:
-            with open(self.metrics_cache_file, 'w') as f:
-                json.dump(metrics, f, indent=2)
+            tmp_file = self.metrics_cache_file + '.tmp'
+            if orjson is not None:
+                with open(tmp_file, 'wb') as f:
+                    f.write(orjson.dumps(metrics))
+            else:
+                with open(tmp_file, 'w') as f:
+                    json.dump(metrics, f, separators=(',', ':'))
+            os.replace(tmp_file, self.metrics_cache_file)
             print(f"✅ Metrics cached to {self.metrics_cache_file}")
             return True
         except Exception as e:
@@ -205,8 +385,9 @@ class DataAggregatorService:
             return self._get_empty_metrics()
 
         try:
-            with open(self.metrics_cache_file, 'r') as f:
-                return json.load(f)
+            with open(self.metrics_cache_file, 'rb') as f:
+                raw = f.read()
+            return orjson.loads(raw) if orjson is not None else json.loads(raw)
         except Exception as e:
             print(f"Error loading cache: {e}")
             return self._get_empty_metrics()
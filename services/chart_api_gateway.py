@@ -12,32 +12,124 @@ This is the entry point for the entire chart generation pipeline.
 
 import os
 import json
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from functools import cached_property, lru_cache
 from typing import Dict, Optional
 from datetime import datetime
 
+try:
+    import orjson  # optional: much faster JSON parse/serialize
+except ImportError:
+    orjson = None
+
 from services.aggregator_service import DataAggregatorService
 from services.chart_config_service import ChartConfigService
 from services.chart_renderer_service import ChartRendererService
 from services.chart_export_service import ChartExportService
 
 
+@lru_cache(maxsize=8)
+def _read_config_file(path: str, mtime: float) -> Dict:
+    """Read and parse a config file, cached per (path, mtime).
+
+    Gateways are re-instantiated per run in some deployments; keying on
+    the mtime means repeated instantiations skip the read and parse
+    while still picking up edits. Callers get a copy via _load_config,
+    so the cached dict itself is never mutated.
+    """
+    with open(path, 'rb') as f:
+        raw = f.read()
+    return orjson.loads(raw) if orjson is not None else json.loads(raw)
+
+
 class ChartAPIGateway:
     """
     API Gateway / Orchestrator for chart microservices.
     Coordinates the execution of all chart-related services.
     """
 
+    # In-process results older than this are recomputed
+    _MEMO_TTL = 60  # seconds
+
     def __init__(self, config_file: Optional[str] = 'config/chart_settings.json'):
         self.config = self._load_config(config_file)
         self.enabled = self.config.get('enabled', True)
 
-        # Initialize all microservices
-        self.aggregator = DataAggregatorService()
-        self.config_service = ChartConfigService()
-        self.renderer = ChartRendererService()
-        self.exporter = ChartExportService()
+        # Bounded: a long-lived gateway logs every stage of every run,
+        # so an unbounded list is a slow memory leak
+        self.execution_log = deque(maxlen=self.config.get('log_max', 200))
 
-        self.execution_log = []
+        # (timestamp, key, result) memos so refresh_cache and
+        # generate_all_charts in one request cycle share work
+        self._metrics_memo = None
+        self._configs_memo = None
+
+        # Configuration is fixed after __init__, so the static part of
+        # the status payload is built once; only the service states and
+        # the log slice are refreshed per call
+        self._status_template = {
+            'gateway': 'operational',
+            'configuration': {
+                'enabled': self.enabled,
+                'days_to_show': self.config.get('days_to_show', 90),
+                'use_cache': self.config.get('use_cache', True)
+            }
+        }
+
+    # Each microservice is constructed on first use: a disabled gateway
+    # or a bare get_service_status() call pays none of their startup
+    # I/O (directory creation, cache-file stats)
+
+    @cached_property
+    def aggregator(self) -> DataAggregatorService:
+        return DataAggregatorService()
+
+    @cached_property
+    def config_service(self) -> ChartConfigService:
+        return ChartConfigService()
+
+    @cached_property
+    def renderer(self) -> ChartRendererService:
+        return ChartRendererService()
+
+    @cached_property
+    def exporter(self) -> ChartExportService:
+        return ChartExportService()
+
+    def _get_metrics(self, use_cache: bool) -> Dict:
+        """Run the aggregator, reusing a fresh in-process result.
+
+        Keyed by (days_to_show, use_cache); entries expire after
+        _MEMO_TTL seconds so long-lived gateways don't serve stale data.
+        """
+        key = (self.config.get('days_to_show', 90), use_cache)
+        memo = self._metrics_memo
+        if memo and memo[1] == key and time.time() - memo[0] < self._MEMO_TTL:
+            self._log_execution('gateway', 'cache_hit', 'Reused in-process metrics')
+            return memo[2]
+
+        metrics = self.aggregator.run(days=key[0], use_cache=use_cache)
+        self._metrics_memo = (time.time(), key, metrics)
+        # Configs and rendered output derived from the previous metrics
+        # are no longer valid
+        self._configs_memo = None
+        if 'renderer' in self.__dict__:
+            self.renderer.invalidate()
+        return metrics
+
+    def _get_configs(self, metrics: Dict, use_cache: bool) -> Dict:
+        """Run the config service, reusing a fresh in-process result"""
+        key = (id(metrics), use_cache)
+        memo = self._configs_memo
+        if memo and memo[1] == key and time.time() - memo[0] < self._MEMO_TTL:
+            self._log_execution('gateway', 'cache_hit', 'Reused in-process chart configs')
+            return memo[2]
+
+        configs = self.config_service.run(metrics, use_cache=use_cache)
+        self._configs_memo = (time.time(), key, configs)
+        return configs
 
     def _load_config(self, config_file: str) -> Dict:
         """Load configuration from JSON file"""
@@ -60,16 +152,21 @@ class ChartAPIGateway:
             }
 
         try:
-            with open(config_file, 'r') as f:
-                return json.load(f)
+            mtime = os.path.getmtime(config_file)
+            return dict(_read_config_file(config_file, mtime))
         except Exception as e:
             print(f"Warning: Error loading config from {config_file}: {e}")
             return {'enabled': True, 'days_to_show': 90}
 
-    def _log_execution(self, service: str, status: str, message: str):
-        """Log service execution for debugging"""
+    def _log_execution(self, service: str, status: str, message: str,
+                       ts: Optional[str] = None):
+        """Log service execution for debugging.
+
+        Callers that log several stages in one run pass a shared ts so
+        the clock is read once per run, not once per entry.
+        """
         self.execution_log.append({
-            'timestamp': datetime.now().isoformat(),
+            'timestamp': ts or datetime.now().isoformat(),
             'service': service,
             'status': status,
             'message': message
@@ -82,24 +179,17 @@ class ChartAPIGateway:
         Returns:
             Dict with service health information
         """
-        status = {
-            'gateway': 'operational',
+        return {
+            **self._status_template,
             'services': {
-                'aggregator': 'operational' if self.aggregator else 'unavailable',
-                'config_service': 'operational' if self.config_service else 'unavailable',
-                'renderer': 'operational' if self.renderer else 'unavailable',
-                'exporter': 'operational' if self.exporter else 'unavailable'
-            },
-            'configuration': {
-                'enabled': self.enabled,
-                'days_to_show': self.config.get('days_to_show', 90),
-                'use_cache': self.config.get('use_cache', True)
+                # 'lazy' means the service hasn't been constructed yet;
+                # it comes up on first use
+                name: 'operational' if name in self.__dict__ else 'lazy'
+                for name in ('aggregator', 'config_service', 'renderer', 'exporter')
             },
-            'execution_log': self.execution_log[-10:]  # Last 10 entries
+            'execution_log': list(self.execution_log)[-10:]  # Last 10 entries
         }
 
-        return status
-
     def refresh_cache(self) -> bool:
         """
         Force refresh of all cached data.
@@ -119,6 +209,13 @@ class ChartAPIGateway:
             # Step 2: Generate configs
             configs = self.config_service.run(metrics, use_cache=False)
 
+            # Drop the in-process memos so later calls pick up the
+            # freshly written caches
+            self._metrics_memo = None
+            self._configs_memo = None
+            if 'renderer' in self.__dict__:
+                self.renderer.invalidate()
+
             print("✅ Cache refreshed successfully")
             return True
 
@@ -139,8 +236,12 @@ class ChartAPIGateway:
         Returns:
             Dict containing all generated content and exports
         """
+        # One clock read serves every log entry and the result
+        # metadata for this run
+        now_iso = datetime.now().isoformat()
+
         if not self.enabled:
-            self._log_execution('gateway', 'disabled', 'Chart generation disabled in config')
+            self._log_execution('gateway', 'disabled', 'Chart generation disabled in config', ts=now_iso)
             return {
                 'enabled': False,
                 'cdn_script': '',
@@ -156,19 +257,16 @@ class ChartAPIGateway:
             # Step 1: Data Aggregation
             print("\n[1/4] Data Aggregation Service")
             try:
-                metrics = self.aggregator.run(
-                    days=self.config.get('days_to_show', 90),
-                    use_cache=self.config.get('use_cache', True)
-                )
-                self._log_execution('aggregator', 'success', f"Processed {metrics['summary']['total_data_points']} data points")
+                metrics = self._get_metrics(self.config.get('use_cache', True))
+                self._log_execution('aggregator', 'success', f"Processed {metrics['summary']['total_data_points']} data points", ts=now_iso)
             except Exception as e:
-                self._log_execution('aggregator', 'error', str(e))
+                self._log_execution('aggregator', 'error', str(e), ts=now_iso)
                 raise Exception(f"Aggregator service failed: {e}")
 
             # Check if we have data
             if metrics['summary']['total_data_points'] == 0:
                 print("⚠️  No historical data available. Skipping chart generation.")
-                self._log_execution('gateway', 'warning', 'No historical data available')
+                self._log_execution('gateway', 'warning', 'No historical data available', ts=now_iso)
                 return {
                     'enabled': True,
                     'has_data': False,
@@ -177,40 +275,45 @@ class ChartAPIGateway:
                     'exports': {}
                 }
 
-            # Step 2: Chart Configuration
-            print("\n[2/4] Chart Configuration Service")
-            try:
-                configs = self.config_service.run(
-                    metrics,
-                    use_cache=self.config.get('use_cache', True)
-                )
-                self._log_execution('config_service', 'success', 'Generated chart configurations')
-            except Exception as e:
-                self._log_execution('config_service', 'error', str(e))
-                raise Exception(f"Config service failed: {e}")
-
-            # Step 3: Chart Rendering
-            print("\n[3/4] Chart Renderer Service")
-            try:
-                rendered = self.renderer.run(configs, metrics)
-                self._log_execution('renderer', 'success', 'Rendered HTML/JavaScript')
-            except Exception as e:
-                self._log_execution('renderer', 'error', str(e))
-                raise Exception(f"Renderer service failed: {e}")
-
-            # Step 4: Data Export
-            print("\n[4/4] Chart Export Service")
-            try:
-                if self.config.get('exports', {}).get('enabled', True):
-                    exports = self.exporter.run(metrics)
-                    self._log_execution('exporter', 'success', f"Exported {len(exports)} formats")
-                else:
+            # The exporter depends only on metrics, so it runs on a
+            # worker thread while configuration and rendering proceed
+            # on the main thread; the two branches join at step 4
+            exports_enabled = self.config.get('exports', {}).get('enabled', True)
+            with ThreadPoolExecutor(max_workers=1) as export_pool:
+                export_future = (export_pool.submit(self.exporter.run, metrics)
+                                 if exports_enabled else None)
+
+                # Step 2: Chart Configuration
+                print("\n[2/4] Chart Configuration Service")
+                try:
+                    configs = self._get_configs(metrics, self.config.get('use_cache', True))
+                    self._log_execution('config_service', 'success', 'Generated chart configurations', ts=now_iso)
+                except Exception as e:
+                    self._log_execution('config_service', 'error', str(e), ts=now_iso)
+                    raise Exception(f"Config service failed: {e}")
+
+                # Step 3: Chart Rendering
+                print("\n[3/4] Chart Renderer Service")
+                try:
+                    rendered = self.renderer.run(configs, metrics)
+                    self._log_execution('renderer', 'success', 'Rendered HTML/JavaScript', ts=now_iso)
+                except Exception as e:
+                    self._log_execution('renderer', 'error', str(e), ts=now_iso)
+                    raise Exception(f"Renderer service failed: {e}")
+
+                # Step 4: Data Export (join the background branch)
+                print("\n[4/4] Chart Export Service")
+                try:
+                    if export_future is not None:
+                        exports = export_future.result()
+                        self._log_execution('exporter', 'success', f"Exported {len(exports)} formats", ts=now_iso)
+                    else:
+                        exports = {}
+                        self._log_execution('exporter', 'skipped', 'Exports disabled in config', ts=now_iso)
+                except Exception as e:
+                    self._log_execution('exporter', 'warning', f"Export failed: {e}", ts=now_iso)
+                    # Non-critical, continue
                     exports = {}
-                    self._log_execution('exporter', 'skipped', 'Exports disabled in config')
-            except Exception as e:
-                self._log_execution('exporter', 'warning', f"Export failed: {e}")
-                # Non-critical, continue
-                exports = {}
 
             print("\n" + "="*60)
             print("✅ Chart Pipeline Completed Successfully")
@@ -224,7 +327,7 @@ class ChartAPIGateway:
                 'charts_section': rendered['charts_section'],
                 'exports': exports,
                 'metadata': {
-                    'generated_at': datetime.now().isoformat(),
+                    'generated_at': now_iso,
                     'service': 'ChartAPIGateway',
                     'version': '1.1.0',
                     'data_points': metrics['summary']['total_data_points'],
@@ -236,7 +339,7 @@ class ChartAPIGateway:
 
         except Exception as e:
             print(f"\n❌ Chart pipeline failed: {e}")
-            self._log_execution('gateway', 'error', str(e))
+            self._log_execution('gateway', 'error', str(e), ts=now_iso)
 
             # Return graceful fallback
             return {
@@ -288,10 +391,14 @@ def main():
 
     print("="*60)
 
-    # Save execution log
+    # Save execution log (machine-consumed, so compact JSON)
     log_file = 'cache/gateway_execution.log'
-    with open(log_file, 'w') as f:
-        json.dump(gateway.execution_log, f, indent=2)
+    if orjson is not None:
+        with open(log_file, 'wb') as f:
+            f.write(orjson.dumps(list(gateway.execution_log)))
+    else:
+        with open(log_file, 'w') as f:
+            json.dump(list(gateway.execution_log), f, separators=(',', ':'))
     print(f"\n📝 Execution log saved to {log_file}")
 
 
@@ -11,10 +11,47 @@ This service is independent and manages all chart styling and configuration.
 """
 
 import os
+import copy
 import json
+import hashlib
 from typing import Dict, List
 from datetime import datetime
 
+try:
+    import orjson  # optional: much faster JSON parse/serialize
+except ImportError:
+    orjson = None
+
+try:
+    from services.metrics_loader import load_metrics
+except ImportError:  # standalone execution from within services/
+    from metrics_loader import load_metrics
+
+
+# Chrome-inspired dark theme colors (matching existing styles.css)
+_DEFAULT_THEME = {
+    'bg_primary': '#1f1f1f',
+    'bg_secondary': '#292929',
+    'bg_tertiary': '#323232',
+    'accent_blue': '#8ab4f8',
+    'accent_green': '#81c995',
+    'accent_red': '#f28b82',
+    'accent_yellow': '#fdd663',
+    'accent_purple': '#c58af9',
+    'text_primary': '#e8eaed',
+    'text_secondary': '#9aa0a6',
+    'border_color': '#3c4043',
+    'grid_color': '#3c404340'
+}
+
+# Hex-alpha variants of the accent colors, concatenated once at import
+# instead of per service instance
+_PALETTE = {
+    f'{name}_{alpha}': color + alpha
+    for name, color in _DEFAULT_THEME.items() if name.startswith('accent_')
+    for alpha in ('20', 'cc', 'dd')
+}
+
 
 class ChartConfigService:
     """
@@ -27,28 +64,45 @@ class ChartConfigService:
         self.config_dir = config_dir
         self.config_cache_file = os.path.join(cache_dir, 'chart_configs.json')
 
-        # Chrome-inspired dark theme colors (matching existing styles.css)
-        self.theme = {
-            'bg_primary': '#1f1f1f',
-            'bg_secondary': '#292929',
-            'bg_tertiary': '#323232',
-            'accent_blue': '#8ab4f8',
-            'accent_green': '#81c995',
-            'accent_red': '#f28b82',
-            'accent_yellow': '#fdd663',
-            'accent_purple': '#c58af9',
-            'text_primary': '#e8eaed',
-            'text_secondary': '#9aa0a6',
-            'border_color': '#3c4043',
-            'grid_color': '#3c404340'
-        }
+        # Instances get their own theme copy but share the interned
+        # module-level palette
+        self.theme = dict(_DEFAULT_THEME)
+        self.fills = _PALETTE
+
+        # The common options never change after construction, so they are
+        # built once here; chart builders spread (and never mutate) them
+        self._common_options = self._build_common_options()
+        self._common_plugins = self._common_options['plugins']
+
+        # Each chart config is mostly static — only the data arrays and a
+        # couple of labels vary per run. The skeletons are built once and
+        # cloned per call, so config generation is a handful of field
+        # writes instead of rebuilding the whole nested literal
+        self._line_tpl = self._build_line_template()
+        self._bar_tpl = self._build_bar_template()
+        self._pie_tpl = self._build_pie_template()
+
+    @staticmethod
+    def _clone(template: Dict) -> Dict:
+        """Deep-copy a JSON-compatible chart template.
+
+        An orjson round-trip is typically faster than copy.deepcopy for
+        pure-JSON dicts; fall back to deepcopy without it.
+        """
+        if orjson is not None:
+            return orjson.loads(orjson.dumps(template))
+        return copy.deepcopy(template)
 
     def get_theme_colors(self) -> Dict:
         """Return theme color palette"""
         return self.theme
 
     def get_common_options(self) -> Dict:
-        """Common Chart.js options for all charts"""
+        """Common Chart.js options for all charts (precomputed)"""
+        return self._common_options
+
+    def _build_common_options(self) -> Dict:
+        """Construct the shared Chart.js options dict"""
         return {
             'responsive': True,
             'maintainAspectRatio': False,
@@ -90,16 +144,27 @@ class ChartConfigService:
         - IPv4 ranges (green line)
         - IPv6 ranges (purple line)
         """
-        config = {
+        config = self._clone(self._line_tpl)
+        data = config['data']
+        data['labels'] = metrics.get('timestamps', [])
+        datasets = data['datasets']
+        datasets[0]['data'] = metrics.get('total_ranges', [])
+        datasets[1]['data'] = metrics.get('ipv4_counts', [])
+        datasets[2]['data'] = metrics.get('ipv6_counts', [])
+        return config
+
+    def _build_line_template(self) -> Dict:
+        """Static skeleton for the line chart; data arrays filled per run"""
+        return {
             'type': 'line',
             'data': {
-                'labels': metrics.get('timestamps', []),
+                'labels': [],
                 'datasets': [
                     {
                         'label': 'Total IP Ranges',
-                        'data': metrics.get('total_ranges', []),
+                        'data': [],
                         'borderColor': self.theme['accent_blue'],
-                        'backgroundColor': self.theme['accent_blue'] + '20',
+                        'backgroundColor': self.fills['accent_blue_20'],
                         'borderWidth': 2,
                         'tension': 0.4,
                         'fill': True,
@@ -109,9 +174,9 @@ class ChartConfigService:
                     },
                     {
                         'label': 'IPv4 Ranges',
-                        'data': metrics.get('ipv4_counts', []),
+                        'data': [],
                         'borderColor': self.theme['accent_green'],
-                        'backgroundColor': self.theme['accent_green'] + '20',
+                        'backgroundColor': self.fills['accent_green_20'],
                         'borderWidth': 2,
                         'tension': 0.4,
                         'fill': True,
@@ -121,9 +186,9 @@ class ChartConfigService:
                     },
                     {
                         'label': 'IPv6 Ranges',
-                        'data': metrics.get('ipv6_counts', []),
+                        'data': [],
                         'borderColor': self.theme['accent_purple'],
-                        'backgroundColor': self.theme['accent_purple'] + '20',
+                        'backgroundColor': self.fills['accent_purple_20'],
                         'borderWidth': 2,
                         'tension': 0.4,
                         'fill': True,
@@ -134,7 +199,7 @@ class ChartConfigService:
                 ]
             },
             'options': {
-                **self.get_common_options(),
+                **self._common_options,
                 'scales': {
                     'x': {
                         'grid': {
@@ -159,7 +224,7 @@ class ChartConfigService:
                     }
                 },
                 'plugins': {
-                    **self.get_common_options()['plugins'],
+                    **self._common_plugins,
                     'title': {
                         'display': True,
                         'text': 'IP Range Growth Over Time',
@@ -174,8 +239,6 @@ class ChartConfigService:
             }
         }
 
-        return config
-
     def get_bar_chart_config(self, metrics: Dict) -> Dict:
         """
         Generate Bar Chart configuration for daily changes.
@@ -184,28 +247,38 @@ class ChartConfigService:
         - Added IP ranges (green bars)
         - Removed IP ranges (red bars)
         """
-        # Limit to last 30 days for readability
-        timestamps = metrics.get('timestamps', [])[-30:]
-        daily_added = metrics.get('daily_added', [])[-30:]
-        daily_removed = metrics.get('daily_removed', [])[-30:]
+        # Limit to last 30 days for readability; series that already fit
+        # are reused as-is instead of copied
+        def tail(series: List) -> List:
+            return series[-30:] if len(series) > 30 else series
+
+        config = self._clone(self._bar_tpl)
+        data = config['data']
+        data['labels'] = tail(metrics.get('timestamps', []))
+        datasets = data['datasets']
+        datasets[0]['data'] = tail(metrics.get('daily_added', []))
+        datasets[1]['data'] = tail(metrics.get('daily_removed', []))
+        return config
 
-        config = {
+    def _build_bar_template(self) -> Dict:
+        """Static skeleton for the bar chart; data arrays filled per run"""
+        return {
             'type': 'bar',
             'data': {
-                'labels': timestamps,
+                'labels': [],
                 'datasets': [
                     {
                         'label': 'Added',
-                        'data': daily_added,
-                        'backgroundColor': self.theme['accent_green'] + 'cc',
+                        'data': [],
+                        'backgroundColor': self.fills['accent_green_cc'],
                         'borderColor': self.theme['accent_green'],
                         'borderWidth': 1,
                         'borderRadius': 4
                     },
                     {
                         'label': 'Removed',
-                        'data': daily_removed,
-                        'backgroundColor': self.theme['accent_red'] + 'cc',
+                        'data': [],
+                        'backgroundColor': self.fills['accent_red_cc'],
                         'borderColor': self.theme['accent_red'],
                         'borderWidth': 1,
                         'borderRadius': 4
@@ -213,7 +286,7 @@ class ChartConfigService:
                 ]
             },
             'options': {
-                **self.get_common_options(),
+                **self._common_options,
                 'scales': {
                     'x': {
                         'grid': {
@@ -237,7 +310,7 @@ class ChartConfigService:
                     }
                 },
                 'plugins': {
-                    **self.get_common_options()['plugins'],
+                    **self._common_plugins,
                     'title': {
                         'display': True,
                         'text': 'Daily IP Range Changes (Last 30 Days)',
@@ -252,8 +325,6 @@ class ChartConfigService:
             }
         }
 
-        return config
-
     def get_pie_chart_config(self, metrics: Dict) -> Dict:
         """
         Generate Pie Chart configuration for IPv4 vs IPv6 distribution.
@@ -271,18 +342,26 @@ class ChartConfigService:
         ipv4_percent = (ipv4_count / total * 100) if total > 0 else 0
         ipv6_percent = (ipv6_count / total * 100) if total > 0 else 0
 
-        config = {
+        config = self._clone(self._pie_tpl)
+        data = config['data']
+        data['labels'] = [
+            f'IPv4 ({ipv4_percent:.1f}%)',
+            f'IPv6 ({ipv6_percent:.1f}%)'
+        ]
+        data['datasets'][0]['data'] = [ipv4_count, ipv6_count]
+        return config
+
+    def _build_pie_template(self) -> Dict:
+        """Static skeleton for the pie chart; labels and counts filled per run"""
+        return {
             'type': 'doughnut',
             'data': {
-                'labels': [
-                    f'IPv4 ({ipv4_percent:.1f}%)',
-                    f'IPv6 ({ipv6_percent:.1f}%)'
-                ],
+                'labels': [],
                 'datasets': [{
-                    'data': [ipv4_count, ipv6_count],
+                    'data': [],
                     'backgroundColor': [
-                        self.theme['accent_green'] + 'dd',
-                        self.theme['accent_purple'] + 'dd'
+                        self.fills['accent_green_dd'],
+                        self.fills['accent_purple_dd']
                     ],
                     'borderColor': [
                         self.theme['accent_green'],
@@ -293,9 +372,9 @@ class ChartConfigService:
                 }]
             },
             'options': {
-                **self.get_common_options(),
+                **self._common_options,
                 'plugins': {
-                    **self.get_common_options()['plugins'],
+                    **self._common_plugins,
                     'title': {
                         'display': True,
                         'text': 'IPv4 vs IPv6 Distribution',
@@ -307,7 +386,7 @@ class ChartConfigService:
                         'padding': 20
                     },
                     'tooltip': {
-                        **self.get_common_options()['plugins']['tooltip'],
+                        **self._common_plugins['tooltip'],
                         'callbacks': {
                             'label': '(ctx) => ctx.label + ": " + ctx.parsed.toLocaleString() + " ranges"'
                         }
@@ -317,8 +396,6 @@ class ChartConfigService:
             }
         }
 
-        return config
-
     def generate_all_configs(self, metrics: Dict) -> Dict:
         """
         Generate all chart configurations.
@@ -341,10 +418,43 @@ class ChartConfigService:
         return configs
 
     def save_to_cache(self, configs: Dict) -> bool:
-        """Save chart configs to cache file"""
+        """Save chart configs to cache file, skipping unchanged content"""
         try:
-            with open(self.config_cache_file, 'w') as f:
-                json.dump(configs, f, indent=2)
+            # Machine-read cache: compact encoding keeps the file small
+            # and the write down to one large block
+            if orjson is not None:
+                data = orjson.dumps(configs)
+            else:
+                data = json.dumps(configs, separators=(',', ':')).encode('utf-8')
+
+            # Only metadata.generated_at moves between identical runs, so
+            # the signature covers the charts alone; a matching sidecar
+            # means the cache on disk is already current
+            charts = {k: v for k, v in configs.items() if k != 'metadata'}
+            if orjson is not None:
+                chart_bytes = orjson.dumps(charts, option=orjson.OPT_SORT_KEYS)
+            else:
+                chart_bytes = json.dumps(
+                    charts, separators=(',', ':'), sort_keys=True
+                ).encode('utf-8')
+            signature = hashlib.blake2b(chart_bytes, digest_size=16).hexdigest()
+            sig_file = self.config_cache_file + '.sig'
+
+            try:
+                with open(sig_file, 'r') as f:
+                    if f.read().strip() == signature and \
+                            os.path.exists(self.config_cache_file):
+                        print(f"✅ Chart configs unchanged, cache kept: {self.config_cache_file}")
+                        return True
+            except OSError:
+                pass
+
+            tmp = self.config_cache_file + '.tmp'
+            with open(tmp, 'wb') as f:
+                f.write(data)
+            os.replace(tmp, self.config_cache_file)
+            with open(sig_file, 'w') as f:
+                f.write(signature)
             print(f"✅ Chart configs cached to {self.config_cache_file}")
             return True
         except Exception as e:
@@ -357,8 +467,11 @@ class ChartConfigService:
             return {}
 
         try:
-            with open(self.config_cache_file, 'r') as f:
-                return json.load(f)
+            with open(self.config_cache_file, 'rb') as f:
+                raw = f.read()
+            if orjson is not None:
+                return orjson.loads(raw)
+            return json.loads(raw)
         except Exception as e:
             print(f"Error loading config cache: {e}")
             return {}
@@ -393,8 +506,7 @@ def main():
         print("❌ No metrics cache found. Run aggregator_service.py first.")
         return
 
-    with open(metrics_file, 'r') as f:
-        metrics = json.load(f)
+    metrics = load_metrics(metrics_file)
 
     service = ChartConfigService()
     configs = service.run(metrics)
@@ -10,12 +10,167 @@ Responsibilities:
 This service provides data portability and external integration.
 """
 
+import io
 import os
 import json
 import csv
-from typing import Dict, List
+import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from itertools import zip_longest
+from typing import Dict, List, Tuple
 from datetime import datetime
 
+try:
+    import orjson  # optional: much faster JSON parse/serialize
+except ImportError:
+    orjson = None
+
+try:
+    from services.metrics_loader import load_metrics
+except ImportError:  # standalone execution from within services/
+    from metrics_loader import load_metrics
+
+
+@lru_cache(maxsize=2)
+def _fmt_now(second: int) -> Tuple[str, str, str]:
+    """Format a whole-second timestamp once per second.
+
+    Returns (isoformat, minute-resolution, second-resolution) strings;
+    the four exports of one run share a single datetime + strftime pass
+    and carry consistent timestamps.
+    """
+    now = datetime.fromtimestamp(second)
+    return (
+        now.isoformat(),
+        now.strftime('%Y-%m-%d %H:%M UTC'),
+        now.strftime('%Y-%m-%d %H:%M:%S UTC')
+    )
+
+
+# The exports index page is static apart from its footer timestamp;
+# the literal is kept at module level so each run only fills one slot
+_INDEX_TEMPLATE = """<!DOCTYPE html>
+<html lang="en">
+<head>
+    <meta charset="UTF-8">
+    <meta name="viewport" content="width=device-width, initial-scale=1.0">
+    <title>Historical Analytics Exports</title>
+    <link rel="stylesheet" href="../../styles.css">
+</head>
+<body>
+    <header class="header">
+        <div class="header-content">
+            <div class="header-left">
+                <div class="logo">
+                    <span class="logo-icon">📊</span>
+                    <h1>Historical Analytics Exports</h1>
+                </div>
+            </div>
+        </div>
+    </header>
+
+    <div class="container">
+        <div class="content">
+            <div class="changes-section">
+                <div class="section-header">
+                    <h2>📥 Download Historical Data</h2>
+                    <span class="badge">3 formats available</span>
+                </div>
+
+                <div style="display: grid; grid-template-columns: repeat(auto-fit, minmax(300px, 1fr)); gap: 16px;">
+                    <a href="historical_metrics.csv" download class="export-card">
+                        <div class="export-icon">📊</div>
+                        <h3>CSV Export</h3>
+                        <p>Excel-compatible spreadsheet</p>
+                        <span class="download-badge">Download .csv</span>
+                    </a>
+
+                    <a href="historical_metrics.json" download class="export-card">
+                        <div class="export-icon">📦</div>
+                        <h3>JSON Export</h3>
+                        <p>API-friendly format</p>
+                        <span class="download-badge">Download .json</span>
+                    </a>
+
+                    <a href="summary.md" download class="export-card">
+                        <div class="export-icon">📄</div>
+                        <h3>Summary Report</h3>
+                        <p>Markdown documentation</p>
+                        <span class="download-badge">Download .md</span>
+                    </a>
+                </div>
+
+                <div style="margin-top: 32px; text-align: center;">
+                    <a href="../../index.html" style="color: var(--accent-blue); text-decoration: none;">
+                        ← Back to Dashboard
+                    </a>
+                </div>
+            </div>
+        </div>
+
+        <div class="footer">
+            <p>Generated on %s</p>
+            <p>Google IP Monitor • Historical Analytics Exports</p>
+        </div>
+    </div>
+
+    <style>
+        .export-card {
+            background-color: var(--card-bg);
+            border: 1px solid var(--border-color);
+            border-radius: 12px;
+            padding: 24px;
+            text-decoration: none;
+            display: flex;
+            flex-direction: column;
+            align-items: center;
+            text-align: center;
+            transition: all 0.2s ease;
+            cursor: pointer;
+        }
+
+        .export-card:hover {
+            background-color: var(--bg-tertiary);
+            border-color: var(--accent-blue);
+            transform: translateY(-4px);
+            box-shadow: 0 8px 16px rgba(0,0,0,0.3);
+        }
+
+        .export-icon {
+            font-size: 48px;
+            margin-bottom: 12px;
+        }
+
+        .export-card h3 {
+            color: var(--text-primary);
+            font-size: 16px;
+            font-weight: 500;
+            margin-bottom: 8px;
+        }
+
+        .export-card p {
+            color: var(--text-secondary);
+            font-size: 13px;
+            margin-bottom: 16px;
+        }
+
+        .download-badge {
+            background-color: var(--accent-blue);
+            color: var(--bg-primary);
+            padding: 6px 14px;
+            border-radius: 20px;
+            font-size: 12px;
+            font-weight: 500;
+        }
+
+        .export-card:hover .download-badge {
+            background-color: var(--accent-green);
+        }
+    </style>
+</body>
+</html>"""
+
 
 class ChartExportService:
     """
@@ -23,10 +178,28 @@ class ChartExportService:
     Single Responsibility: Multi-format data export.
     """
 
+    # How long (seconds) an existing exports index stays fresh before it
+    # is rewritten just to bump its footer timestamp
+    _INDEX_TTL = 3600
+
     def __init__(self, export_dir: str = 'exports/charts'):
         self.export_dir = export_dir
         os.makedirs(export_dir, exist_ok=True)
 
+    @staticmethod
+    def _write_atomic(path: str, payload) -> None:
+        """Write a fully-built payload (str or bytes) and rename into place.
+
+        Readers — GitHub Pages included — never observe a partial file,
+        and the whole export lands in one large write instead of many
+        small ones.
+        """
+        data = payload.encode('utf-8') if isinstance(payload, str) else payload
+        tmp = path + '.tmp'
+        with open(tmp, 'wb') as f:
+            f.write(data)
+        os.replace(tmp, path)
+
     def export_to_csv(self, metrics: Dict) -> str:
         """
         Export historical metrics to CSV format.
@@ -44,33 +217,32 @@ class ChartExportService:
         daily_removed = metrics.get('daily_removed', [])
 
         try:
-            with open(csv_file, 'w', newline='') as f:
-                writer = csv.writer(f)
-
-                # Write header
-                writer.writerow([
-                    'Date',
-                    'Total Ranges',
-                    'IPv4 Count',
-                    'IPv6 Count',
-                    'Daily Added',
-                    'Daily Removed',
-                    'Net Change'
-                ])
-
-                # Write data rows
-                for i in range(len(timestamps)):
-                    net_change = daily_added[i] - daily_removed[i] if i < len(daily_added) and i < len(daily_removed) else 0
-                    writer.writerow([
-                        timestamps[i],
-                        total_ranges[i] if i < len(total_ranges) else 0,
-                        ipv4_counts[i] if i < len(ipv4_counts) else 0,
-                        ipv6_counts[i] if i < len(ipv6_counts) else 0,
-                        daily_added[i] if i < len(daily_added) else 0,
-                        daily_removed[i] if i < len(daily_removed) else 0,
-                        net_change
-                    ])
-
+            buf = io.StringIO()
+            writer = csv.writer(buf)
+
+            # Write header
+            writer.writerow([
+                'Date',
+                'Total Ranges',
+                'IPv4 Count',
+                'IPv6 Count',
+                'Daily Added',
+                'Daily Removed',
+                'Net Change'
+            ])
+
+            # Write data rows in one C-level writerows call; zip_longest
+            # pads any short series with 0 like the old per-index checks
+            writer.writerows(
+                (ts, total, ipv4, ipv6, added, removed, added - removed)
+                for ts, total, ipv4, ipv6, added, removed in zip_longest(
+                    timestamps, total_ranges, ipv4_counts,
+                    ipv6_counts, daily_added, daily_removed,
+                    fillvalue=0
+                )
+            )
+
+            self._write_atomic(csv_file, buf.getvalue())
             print(f"✅ CSV export: {csv_file}")
             return csv_file
 
@@ -99,16 +271,20 @@ class ChartExportService:
                 },
                 'summary': metrics.get('summary', {}),
                 'metadata': {
-                    'exported_at': datetime.now().isoformat(),
+                    'exported_at': _fmt_now(int(time.time()))[0],
                     'service': 'ChartExportService',
                     'version': '1.1.0',
                     'format': 'json'
                 }
             }
 
-            with open(json_file, 'w') as f:
-                json.dump(export_data, f, indent=2)
+            # Consumed by scripts and API clients, so skip pretty-printing
+            if orjson is not None:
+                data = orjson.dumps(export_data)
+            else:
+                data = json.dumps(export_data, separators=(',', ':'))
 
+            self._write_atomic(json_file, data)
             print(f"✅ JSON export: {json_file}")
             return json_file
 
@@ -134,7 +310,7 @@ class ChartExportService:
 
 - **Data Points**: {summary.get('total_data_points', 0)}
 - **Date Range**: {date_range.get('start', 'N/A')} to {date_range.get('end', 'N/A')}
-- **Generated**: {datetime.now().strftime('%Y-%m-%d %H:%M UTC')}
+- **Generated**: {_fmt_now(int(time.time()))[1]}
 
 ## Current Statistics
 
@@ -156,9 +332,7 @@ class ChartExportService:
 *Generated by Google IP Monitor v1.1.0*
 """
 
-            with open(md_file, 'w') as f:
-                f.write(markdown)
-
+            self._write_atomic(md_file, markdown)
             print(f"✅ Markdown export: {md_file}")
             return md_file
 
@@ -175,131 +349,19 @@ class ChartExportService:
         """
         index_file = os.path.join(self.export_dir, 'index.html')
 
-        html = f"""<!DOCTYPE html>
-<html lang="en">
-<head>
-    <meta charset="UTF-8">
-    <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <title>Historical Analytics Exports</title>
-    <link rel="stylesheet" href="../../styles.css">
-</head>
-<body>
-    <header class="header">
-        <div class="header-content">
-            <div class="header-left">
-                <div class="logo">
-                    <span class="logo-icon">📊</span>
-                    <h1>Historical Analytics Exports</h1>
-                </div>
-            </div>
-        </div>
-    </header>
-
-    <div class="container">
-        <div class="content">
-            <div class="changes-section">
-                <div class="section-header">
-                    <h2>📥 Download Historical Data</h2>
-                    <span class="badge">3 formats available</span>
-                </div>
-
-                <div style="display: grid; grid-template-columns: repeat(auto-fit, minmax(300px, 1fr)); gap: 16px;">
-                    <a href="historical_metrics.csv" download class="export-card">
-                        <div class="export-icon">📊</div>
-                        <h3>CSV Export</h3>
-                        <p>Excel-compatible spreadsheet</p>
-                        <span class="download-badge">Download .csv</span>
-                    </a>
-
-                    <a href="historical_metrics.json" download class="export-card">
-                        <div class="export-icon">📦</div>
-                        <h3>JSON Export</h3>
-                        <p>API-friendly format</p>
-                        <span class="download-badge">Download .json</span>
-                    </a>
-
-                    <a href="summary.md" download class="export-card">
-                        <div class="export-icon">📄</div>
-                        <h3>Summary Report</h3>
-                        <p>Markdown documentation</p>
-                        <span class="download-badge">Download .md</span>
-                    </a>
-                </div>
-
-                <div style="margin-top: 32px; text-align: center;">
-                    <a href="../../index.html" style="color: var(--accent-blue); text-decoration: none;">
-                        ← Back to Dashboard
-                    </a>
-                </div>
-            </div>
-        </div>
-
-        <div class="footer">
-            <p>Generated on {datetime.now().strftime('%Y-%m-%d %H:%M:%S UTC')}</p>
-            <p>Google IP Monitor • Historical Analytics Exports</p>
-        </div>
-    </div>
-
-    <style>
-        .export-card {{
-            background-color: var(--card-bg);
-            border: 1px solid var(--border-color);
-            border-radius: 12px;
-            padding: 24px;
-            text-decoration: none;
-            display: flex;
-            flex-direction: column;
-            align-items: center;
-            text-align: center;
-            transition: all 0.2s ease;
-            cursor: pointer;
-        }}
-
-        .export-card:hover {{
-            background-color: var(--bg-tertiary);
-            border-color: var(--accent-blue);
-            transform: translateY(-4px);
-            box-shadow: 0 8px 16px rgba(0,0,0,0.3);
-        }}
-
-        .export-icon {{
-            font-size: 48px;
-            margin-bottom: 12px;
-        }}
-
-        .export-card h3 {{
-            color: var(--text-primary);
-            font-size: 16px;
-            font-weight: 500;
-            margin-bottom: 8px;
-        }}
-
-        .export-card p {{
-            color: var(--text-secondary);
-            font-size: 13px;
-            margin-bottom: 16px;
-        }}
-
-        .download-badge {{
-            background-color: var(--accent-blue);
-            color: var(--bg-primary);
-            padding: 6px 14px;
-            border-radius: 20px;
-            font-size: 12px;
-            font-weight: 500;
-        }}
+        # Only the footer timestamp changes — keep a recent copy instead
+        # of rewriting the page on every run
+        try:
+            if time.time() - os.path.getmtime(index_file) < self._INDEX_TTL:
+                print(f"✅ Export index fresh, skipping rewrite: {index_file}")
+                return index_file
+        except OSError:
+            pass
 
-        .export-card:hover .download-badge {{
-            background-color: var(--accent-green);
-        }}
-    </style>
-</body>
-</html>"""
+        html = _INDEX_TEMPLATE % _fmt_now(int(time.time()))[2]
 
         try:
-            with open(index_file, 'w') as f:
-                f.write(html)
-
+            self._write_atomic(index_file, html)
             print(f"✅ Export index: {index_file}")
             return index_file
 
@@ -314,14 +376,16 @@ class ChartExportService:
         Returns:
             Dict containing paths to all generated exports
         """
-        exports = {
-            'csv': self.export_to_csv(metrics),
-            'json': self.export_to_json(metrics),
-            'markdown': self.export_summary_markdown(metrics),
-            'index': self.generate_exports_index()
-        }
-
-        return exports
+        # The four exports touch independent files, so their writes are
+        # overlapped in a small thread pool instead of run back to back
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            futures = {
+                'csv': executor.submit(self.export_to_csv, metrics),
+                'json': executor.submit(self.export_to_json, metrics),
+                'markdown': executor.submit(self.export_summary_markdown, metrics),
+                'index': executor.submit(self.generate_exports_index)
+            }
+            return {name: future.result() for name, future in futures.items()}
 
     def run(self, metrics: Dict) -> Dict:
         """
@@ -350,8 +414,7 @@ def main():
         print("❌ No metrics cache found. Run aggregator_service.py first.")
         return
 
-    with open(metrics_file, 'r') as f:
-        metrics = json.load(f)
+    metrics = load_metrics(metrics_file)
 
     service = ChartExportService()
     exports = service.run(metrics)
@@ -10,9 +10,26 @@ Responsibilities:
 This service transforms configurations into renderable HTML/JavaScript.
 """
 
+import io
 import json
 from typing import Dict
 
+try:
+    import orjson  # optional: much faster JSON parse/serialize
+except ImportError:
+    orjson = None
+
+
+# Translation table for escaping text interpolated into HTML; a single
+# str.translate pass is cheaper than html.escape's chained replaces
+_HTML_ESC = str.maketrans({
+    '&': '&amp;',
+    '<': '&lt;',
+    '>': '&gt;',
+    '"': '&quot;',
+    "'": '&#39;'
+})
+
 
 class ChartRendererService:
     """
@@ -20,70 +37,211 @@ class ChartRendererService:
     Single Responsibility: HTML/JavaScript generation for charts.
     """
 
+    # The renderer carries only its two memo dicts; slots drop the
+    # per-instance __dict__ and make attribute reads C-level slot access
+    __slots__ = ('_json_cache', '_render_cache')
+
+    # Upper bound on memoized serialized configs; one render pass only
+    # ever has three live at a time
+    _JSON_CACHE_MAX = 32
+
+    # The CDN URL never varies, so the include tag is assembled once at
+    # class creation rather than per render
+    chartjs_cdn = "https://cdn.jsdelivr.net/npm/chart.js@4.4.0/dist/chart.umd.min.js"
+    _CDN_TAG = f'<script src="{chartjs_cdn}"></script>'
+
+    # (canvas id, container height, config key) per chart, in dashboard
+    # order — section assembly iterates this instead of one call path per
+    # chart type, and new charts only need a row here
+    _CHART_SPECS = (
+        ('lineChart', '400px', 'line_chart'),
+        ('barChart', '350px', 'bar_chart'),
+        ('pieChart', '320px', 'pie_chart')
+    )
+
+    # Static HTML skeletons, built once at class creation; renders only
+    # fill in the %s slots instead of re-assembling f-string literals
+    _CANVAS_TMPL = '''
+        <div class="chart-container" style="position: relative; height: %s; margin-bottom: 32px;">
+            <canvas id="%s"></canvas>
+        </div>
+        '''
+
+    # Each config ships as an inert JSON island; the browser's native
+    # JSON.parse handles it instead of the JS source parser, and no
+    # per-chart IIFE scaffolding is repeated
+    _CONFIG_TMPL = '<script type="application/json" id="cfg-%s">%s</script>'
+
+    # Single pre-minified bootstrap emitted once per section: it finds
+    # every cfg-* island, parses it and instantiates the matching chart
+    _BOOTSTRAP = (
+        '<script>document.querySelectorAll(\'script[type="application/json"][id^="cfg-"]\')'
+        '.forEach(function(s){var i=s.id.slice(4),c=document.getElementById(i);'
+        'if(!c){console.error("Canvas element #"+i+" not found");return;}'
+        'new Chart(c,JSON.parse(s.textContent));});</script>'
+    )
+
+    _SECTION_HEAD = '''
+        <div class="charts-section">
+            <div class="section-header">
+                <h2>📈 Historical Analytics</h2>
+                <span class="badge">%s to %s • %s data points</span>
+            </div>
+
+            <div class="chart-grid">
+                <div class="chart-card full-width">
+                    '''
+
+    _SECTION_MID = '''
+                </div>
+
+                <div class="chart-card">
+                    '''
+
+    _SECTION_TAIL = '''
+                </div>
+            </div>
+
+            <div class="chart-summary">
+                <div class="summary-stat">
+                    <span class="label">Total Growth</span>
+                    <span class="value %s">%s</span>
+                </div>
+                <div class="summary-stat">
+                    <span class="label">Avg Daily Change</span>
+                    <span class="value">%s</span>
+                </div>
+                <div class="summary-stat">
+                    <span class="label">Current IPv4</span>
+                    <span class="value">%s</span>
+                </div>
+                <div class="summary-stat">
+                    <span class="label">Current IPv6</span>
+                    <span class="value">%s</span>
+                </div>
+            </div>
+        </div>
+        '''
+
     def __init__(self):
-        self.chartjs_cdn = "https://cdn.jsdelivr.net/npm/chart.js@4.4.0/dist/chart.umd.min.js"
+        # Serialized-config memo keyed by id(config): repeated renders of
+        # the same config dict skip json.dumps entirely
+        self._json_cache = {}
+        # Full render memo keyed by (id(configs), id(metrics)): repeat
+        # runs against the same objects return the finished dict
+        self._render_cache = {}
+
+    def invalidate(self):
+        """Drop memoized output (call when configs/metrics are regenerated)"""
+        self._json_cache.clear()
+        self._render_cache.clear()
+
+    def clear_cache(self):
+        """Alias for invalidate(), matching the other services' naming"""
+        self.invalidate()
+
+    def _config_json(self, config) -> str:
+        """Serialize a chart config, memoized by object identity.
+
+        Callers that already hold the serialized form may pass str or
+        bytes — it is embedded verbatim with no decode/re-encode cycle.
+        """
+        if isinstance(config, str):
+            return config
+        if isinstance(config, (bytes, bytearray)):
+            return config.decode('utf-8')
+        # The entry pins the config object so its id cannot be recycled
+        # by the allocator; the identity check guards against a lookup
+        # racing a clear
+        key = id(config)
+        entry = self._json_cache.get(key)
+        if entry is not None and entry[0] is config:
+            return entry[1]
+        if len(self._json_cache) >= self._JSON_CACHE_MAX:
+            self._json_cache.clear()
+        # Compact output — the browser doesn't need indentation and the
+        # whitespace would only pad index.html
+        if orjson is not None:
+            result = orjson.dumps(config).decode('utf-8')
+        else:
+            result = json.dumps(config, separators=(',', ':'))
+        self._json_cache[key] = (config, result)
+        return result
 
     def render_canvas(self, chart_id: str, height: str = "400px") -> str:
         """Generate HTML canvas element for a chart"""
-        return f'''
-        <div class="chart-container" style="position: relative; height: {height}; margin-bottom: 32px;">
-            <canvas id="{chart_id}"></canvas>
-        </div>
-        '''
+        return self._CANVAS_TMPL % (height, chart_id)
 
     def render_chart_script(self, chart_id: str, config: Dict) -> str:
         """
-        Generate Chart.js initialization script.
+        Generate the chart's embedded config JSON island.
 
         Args:
             chart_id: DOM element ID for the canvas
-            config: Chart.js configuration object
+            config: Chart.js configuration object (or pre-serialized JSON)
 
         Returns:
-            JavaScript code as string
+            Inert <script type="application/json"> tag; the shared
+            bootstrap emitted by the section instantiates the chart
         """
-        config_json = json.dumps(config, indent=4)
-
-        script = f'''
-        <script>
-        (function() {{
-            const ctx = document.getElementById('{chart_id}');
-            if (!ctx) {{
-                console.error('Canvas element #{chart_id} not found');
-                return;
-            }}
-
-            const config = {config_json};
-
-            // Create chart instance
-            new Chart(ctx, config);
-        }})();
-        </script>
-        '''
+        return self._CONFIG_TMPL % (chart_id, self._config_json(config))
 
-        return script
+    def _chart_fragments(self, chart_id: str, height: str, config: Dict) -> tuple:
+        """Return the (canvas, script) fragments for one chart unjoined,
+        so section assembly can splice them into its part list directly"""
+        return (
+            self.render_canvas(chart_id, height=height),
+            self.render_chart_script(chart_id, config)
+        )
 
     def render_line_chart(self, config: Dict) -> str:
         """Render line chart (IP growth over time)"""
-        canvas = self.render_canvas('lineChart', height='400px')
-        script = self.render_chart_script('lineChart', config)
-        return canvas + script
+        return ''.join(self._chart_fragments('lineChart', '400px', config))
 
     def render_bar_chart(self, config: Dict) -> str:
         """Render bar chart (daily changes)"""
-        canvas = self.render_canvas('barChart', height='350px')
-        script = self.render_chart_script('barChart', config)
-        return canvas + script
+        return ''.join(self._chart_fragments('barChart', '350px', config))
 
     def render_pie_chart(self, config: Dict) -> str:
         """Render pie chart (IPv4 vs IPv6 distribution)"""
-        canvas = self.render_canvas('pieChart', height='320px')
-        script = self.render_chart_script('pieChart', config)
-        return canvas + script
+        return ''.join(self._chart_fragments('pieChart', '320px', config))
 
     def render_chartjs_cdn(self) -> str:
-        """Generate Chart.js CDN script tag"""
-        return f'<script src="{self.chartjs_cdn}"></script>'
+        """Return the prebuilt Chart.js CDN script tag"""
+        return self._CDN_TAG
+
+    def stream_charts_section(self, configs: Dict, metrics: Dict, out) -> None:
+        """
+        Emit the charts section fragment by fragment through out.write.
+
+        Writing to the target as fragments are built keeps only one
+        fragment alive at a time instead of materializing the whole
+        section; out may be a file, socket wrapper or StringIO.
+        """
+        summary = metrics.get('summary', {})
+        date_range = summary.get('date_range', {})
+        total_growth = summary.get('total_growth', 0)
+        write = out.write
+
+        write(self._SECTION_HEAD % (
+            str(date_range.get('start', 'N/A')).translate(_HTML_ESC),
+            str(date_range.get('end', 'N/A')).translate(_HTML_ESC),
+            summary.get('total_data_points', 0)
+        ))
+        for index, (chart_id, height, config_key) in enumerate(self._CHART_SPECS):
+            if index:
+                write(self._SECTION_MID)
+            for fragment in self._chart_fragments(
+                    chart_id, height, configs.get(config_key, {})):
+                write(fragment)
+        write(self._SECTION_TAIL % (
+            'positive' if total_growth >= 0 else 'negative',
+            format(total_growth, '+d'),
+            format(summary.get('avg_daily_change', 0), '.2f'),
+            format(summary.get('current_ipv4', 0), ','),
+            format(summary.get('current_ipv6', 0), ',')
+        ))
+        write(self._BOOTSTRAP)
 
     def render_charts_section(self, configs: Dict, metrics: Dict) -> str:
         """
@@ -96,54 +254,9 @@ class ChartRendererService:
         Returns:
             Complete HTML section with all charts
         """
-        summary = metrics.get('summary', {})
-        date_range = summary.get('date_range', {})
-        total_points = summary.get('total_data_points', 0)
-
-        # Build charts HTML
-        charts_html = f'''
-        <div class="charts-section">
-            <div class="section-header">
-                <h2>📈 Historical Analytics</h2>
-                <span class="badge">{date_range.get('start', 'N/A')} to {date_range.get('end', 'N/A')} • {total_points} data points</span>
-            </div>
-
-            <div class="chart-grid">
-                <div class="chart-card full-width">
-                    {self.render_line_chart(configs.get('line_chart', {}))}
-                </div>
-
-                <div class="chart-card">
-                    {self.render_bar_chart(configs.get('bar_chart', {}))}
-                </div>
-
-                <div class="chart-card">
-                    {self.render_pie_chart(configs.get('pie_chart', {}))}
-                </div>
-            </div>
-
-            <div class="chart-summary">
-                <div class="summary-stat">
-                    <span class="label">Total Growth</span>
-                    <span class="value {'positive' if summary.get('total_growth', 0) >= 0 else 'negative'}">{summary.get('total_growth', 0):+d}</span>
-                </div>
-                <div class="summary-stat">
-                    <span class="label">Avg Daily Change</span>
-                    <span class="value">{summary.get('avg_daily_change', 0):.2f}</span>
-                </div>
-                <div class="summary-stat">
-                    <span class="label">Current IPv4</span>
-                    <span class="value">{summary.get('current_ipv4', 0):,}</span>
-                </div>
-                <div class="summary-stat">
-                    <span class="label">Current IPv6</span>
-                    <span class="value">{summary.get('current_ipv6', 0):,}</span>
-                </div>
-            </div>
-        </div>
-        '''
-
-        return charts_html
+        buf = io.StringIO()
+        self.stream_charts_section(configs, metrics, buf)
+        return buf.getvalue()
 
     def render_all_charts(self, configs: Dict, metrics: Dict) -> Dict:
         """
@@ -154,7 +267,15 @@ class ChartRendererService:
             - cdn_script: Chart.js CDN include
             - charts_section: Complete HTML for charts section
         """
-        return {
+        # Entries pin both input objects so their ids cannot be recycled
+        # and a hit is confirmed by identity, never by id alone
+        key = (id(configs), id(metrics))
+        entry = self._render_cache.get(key)
+        if entry is not None and entry[0] is configs and entry[1] is metrics:
+            return entry[2]
+        if len(self._render_cache) >= self._JSON_CACHE_MAX:
+            self._render_cache.clear()
+        rendered = {
             'cdn_script': self.render_chartjs_cdn(),
             'charts_section': self.render_charts_section(configs, metrics),
             'metadata': {
@@ -162,6 +283,8 @@ class ChartRendererService:
                 'version': '1.1.0'
             }
         }
+        self._render_cache[key] = (configs, metrics, rendered)
+        return rendered
 
     def run(self, configs: Dict, metrics: Dict) -> Dict:
         """
@@ -181,9 +304,19 @@ class ChartRendererService:
         return rendered
 
 
+def _load_json(path: str) -> Dict:
+    """Read and decode one cache file (orjson when available)"""
+    with open(path, 'rb') as f:
+        raw = f.read()
+    if orjson is not None:
+        return orjson.loads(raw)
+    return json.loads(raw)
+
+
 def main():
     """Standalone execution for testing"""
     import os
+    from concurrent.futures import ThreadPoolExecutor
 
     # Load configs and metrics from cache
     configs_file = 'cache/chart_configs.json'
@@ -193,11 +326,13 @@ def main():
         print("❌ Cache files not found. Run aggregator and config services first.")
         return
 
-    with open(configs_file, 'r') as f:
-        configs = json.load(f)
-
-    with open(metrics_file, 'r') as f:
-        metrics = json.load(f)
+    # Overlap the two independent cache reads instead of waiting on each
+    # in turn
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        configs_future = executor.submit(_load_json, configs_file)
+        metrics_future = executor.submit(_load_json, metrics_file)
+        configs = configs_future.result()
+        metrics = metrics_future.result()
 
     service = ChartRendererService()
     rendered = service.run(configs, metrics)
@@ -209,11 +344,18 @@ def main():
     print(f"Charts section generated: {len(rendered['charts_section'])} bytes")
     print("="*50)
 
-    # Save test output
-    with open('cache/rendered_charts.html', 'w') as f:
-        f.write(rendered['cdn_script'])
-        f.write('\n')
-        f.write(rendered['charts_section'])
+    # Save test output — all fragments go out in one scatter-gather
+    # syscall instead of three buffered writes
+    fd = os.open('cache/rendered_charts.html',
+                 os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+    try:
+        os.writev(fd, [
+            rendered['cdn_script'].encode('utf-8'),
+            b'\n',
+            rendered['charts_section'].encode('utf-8')
+        ])
+    finally:
+        os.close(fd)
 
     print("✅ Test output saved to cache/rendered_charts.html")
 
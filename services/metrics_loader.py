@@ -0,0 +1,37 @@
+"""
+Shared Metrics Cache Loader
+
+The config and export services both read cache/metrics.json when run
+standalone, and the gateway may drive them in one process. Loading goes
+through a single memoized reader here so the blob is parsed once per
+file version instead of once per caller.
+"""
+
+import os
+import json
+from functools import lru_cache
+from typing import Dict
+
+try:
+    import orjson  # optional: much faster JSON parse/serialize
+except ImportError:
+    orjson = None
+
+
+@lru_cache(maxsize=4)
+def _read_metrics_file(path: str, mtime: float) -> Dict:
+    """Parse a metrics file; mtime keys the memo so edits invalidate it"""
+    with open(path, 'rb') as f:
+        raw = f.read()
+    if orjson is not None:
+        return orjson.loads(raw)
+    return json.loads(raw)
+
+
+def load_metrics(path: str = 'cache/metrics.json') -> Dict:
+    """Load aggregated metrics, memoized by (path, mtime).
+
+    Callers must treat the returned dict as read-only — it is shared
+    across everyone who loads the same file version.
+    """
+    return _read_metrics_file(path, os.path.getmtime(path))
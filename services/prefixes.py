@@ -0,0 +1,199 @@
+"""
+Shared Prefix Extraction Helpers
+
+The monitor, report generator and aggregator service all walk the same
+cloud/goog snapshot layout. Keeping the extraction — and the
+.prefixes.txt sidecar read/write path — here gives them one hot loop
+instead of three divergent copies.
+"""
+
+import os
+import json
+import mmap
+from itertools import chain
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+try:
+    import orjson  # optional: much faster JSON parse/serialize
+except ImportError:
+    orjson = None
+
+try:
+    import ijson  # optional: incremental parser, avoids whole-file dicts
+except ImportError:
+    ijson = None
+
+
+def sorted_diff(new: List[str], old: List[str]) -> Tuple[List[str], List[str]]:
+    """Two-pointer symmetric difference of two sorted lists.
+
+    Returns (added, removed), each already in sorted order. No hash
+    table is allocated and no string is hashed; both inputs are
+    streamed sequentially, which suits prefix lists that are already
+    kept sorted on disk (the report's sidecar caches).
+    """
+    i = j = 0
+    len_new, len_old = len(new), len(old)
+    added: List[str] = []
+    removed: List[str] = []
+    while i < len_new and j < len_old:
+        a = new[i]
+        b = old[j]
+        if a == b:
+            i += 1
+            j += 1
+        elif a < b:
+            added.append(a)
+            i += 1
+        else:
+            removed.append(b)
+            j += 1
+    added.extend(new[i:])
+    removed.extend(old[j:])
+    return added, removed
+
+
+def sorted_diff_counts(new: List[str], old: List[str]) -> Tuple[int, int]:
+    """Count (added, removed) between two sorted lists without
+    materializing the difference.
+
+    Same two-pointer merge as sorted_diff, but only the cardinalities
+    are kept — the counting variant for callers like the aggregator
+    that chart change volumes, not change membership.
+    """
+    i = j = added = removed = 0
+    len_new, len_old = len(new), len(old)
+    while i < len_new and j < len_old:
+        a = new[i]
+        b = old[j]
+        if a == b:
+            i += 1
+            j += 1
+        elif a < b:
+            added += 1
+            i += 1
+        else:
+            removed += 1
+            j += 1
+    return added + (len_new - i), removed + (len_old - j)
+
+
+def diff_prefixes(old: Set[str], new: Set[str]) -> Tuple[Set[str], Set[str]]:
+    """Return (added, removed) between two prefix sets.
+
+    Both differences run as C-level hash probes; keeping the diff here
+    gives batch/backfill consumers one shared hot path.
+    """
+    return new - old, old - new
+
+
+def extract_prefixes(data: Dict) -> Tuple[Set[str], Set[str]]:
+    """Extract (ipv4, ipv6) prefix sets from a cloud/goog data snapshot.
+
+    The JSON key already tells the families apart, so they are split
+    during insertion — callers never have to rescan every string for a
+    ':' afterwards.
+    """
+    ipv4: Set[str] = set()
+    ipv6: Set[str] = set()
+    if not data:
+        return ipv4, ipv6
+
+    # One chained pass over both sources, with the set adds bound once
+    # instead of resolved per element — each entry dict is touched a
+    # single time
+    add_v4 = ipv4.add
+    add_v6 = ipv6.add
+    entries = chain(
+        (data.get('cloud') or {}).get('prefixes', ()),
+        (data.get('goog') or {}).get('prefixes', ()),
+    )
+    for p in entries:
+        v = p.get('ipv4Prefix')
+        if v:
+            add_v4(v)
+        v = p.get('ipv6Prefix')
+        if v:
+            add_v6(v)
+
+    return ipv4, ipv6
+
+
+def write_prefix_sidecar(cache_file: str, prefixes: Iterable[str]) -> None:
+    """Atomically write prefix lines to a .prefixes.txt sidecar.
+
+    Every consumer trusts a sidecar whose mtime is at least the
+    snapshot's, so a torn in-place write would be mistaken for a valid
+    cache; writing to a temp file and renaming into place makes that
+    impossible.
+    """
+    tmp_file = cache_file + '.tmp'
+    with open(tmp_file, 'w') as f:
+        f.write('\n'.join(prefixes))
+    os.replace(tmp_file, cache_file)
+
+
+def load_day_prefixes(file_path: str) -> Optional[Tuple[List[str], List[str]]]:
+    """Load a snapshot's sorted (ipv4, ipv6) lists via its sidecar.
+
+    When <date>.prefixes.txt is at least as fresh as the JSON it is
+    read back with a plain split and the raw snapshot is never parsed.
+    On a miss the snapshot is parsed (ijson streaming when available,
+    else mmap+orjson or stdlib json), the prefixes extracted, and the
+    sidecar rewritten atomically for every later consumer. The lists
+    come back sorted, ready for the merge-based diff kernels; returns
+    None if the snapshot cannot be read.
+    """
+    cache_file = file_path.replace('.json', '.prefixes.txt')
+    if (os.path.exists(cache_file)
+            and os.path.getmtime(cache_file) >= os.path.getmtime(file_path)):
+        ipv4 = []
+        ipv6 = []
+        # Appending preserves the on-disk sorted order per family
+        with open(cache_file, 'r') as f:
+            for line in f.read().split():
+                (ipv6 if ':' in line else ipv4).append(line)
+        return ipv4, ipv6
+
+    try:
+        if ijson is not None:
+            # Stream prefix entries one at a time straight into the
+            # sets; only the two prefix keys are consumed, so the rest
+            # of the snapshot dict is never materialized
+            ipv4 = set()
+            ipv6 = set()
+            with open(file_path, 'rb') as f:
+                for source in ('cloud', 'goog'):
+                    f.seek(0)
+                    for p in ijson.items(f, f'{source}.prefixes.item'):
+                        v4 = p.get('ipv4Prefix')
+                        v6 = p.get('ipv6Prefix')
+                        if v4:
+                            ipv4.add(v4)
+                        if v6:
+                            ipv6.add(v6)
+        else:
+            # mmap lets orjson parse the file in place with no
+            # userspace read buffer; stdlib json needs the bytes whole
+            with open(file_path, 'rb') as f:
+                if orjson is not None:
+                    with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                        view = memoryview(mm)
+                        try:
+                            data = orjson.loads(view)
+                        finally:
+                            view.release()
+                else:
+                    data = json.loads(f.read())
+            ipv4, ipv6 = extract_prefixes(data)
+    except Exception as e:
+        print(f"Error loading {file_path}: {e}")
+        return None
+
+    # The sort both feeds the merge kernel and fixes the sidecar's
+    # on-disk order, so it is paid once per snapshot
+    ipv4 = sorted(ipv4)
+    ipv6 = sorted(ipv6)
+    write_prefix_sidecar(cache_file, chain(ipv4, ipv6))
+
+    return ipv4, ipv6